@@ -0,0 +1,275 @@
+"""Benchmarks for the hot paths of the NumPy tasks.
+
+Every case is timed over parametrized sizes (number of elements, or rows for the
+transaction cases). The wall time is the best of several repeats, peak memory comes
+from a separate tracemalloc run, and throughput is elements per second. Results are
+written as JSON. When a baseline file exists, every case slower or hungrier than
+``tolerance`` times its baseline is reported and the run exits with status 1.
+
+Usage:
+    python -m benchmarks.run --sizes 1e3 1e5 1e7 --output bench.json
+    python -m benchmarks.run --save-baseline
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from numpy_tasks import task_2, task_3, task_4
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+TEXT_FORMAT_SIZE_LIMIT = 1_000_000
+NOISE_FLOOR_SECONDS = 0.001
+NOISE_FLOOR_BYTES = 64 * 1024
+
+Benchmark = Callable[[], Any]
+Setup = Callable[[int], Benchmark | None]
+
+
+def _square_array(size: int) -> npt.NDArray[Any]:
+    side = max(int(np.sqrt(size)) // 2 * 2, 2)
+    return np.random.default_rng(0).integers(1, 100, size=(side, side))
+
+
+def _worker_counts() -> list[int]:
+    cores = os.cpu_count() or 1
+    return sorted(
+        {1 << power for power in range(cores.bit_length()) if 1 << power <= cores} | {cores}
+    )
+
+
+def _transactions(size: int) -> npt.NDArray[Any]:
+    return task_2.generate_transactions_bulk(size, seed=0)
+
+
+def _task_2_cases() -> dict[str, Setup]:
+    now = datetime.datetime.now()
+    start = now - datetime.timedelta(weeks=2)
+
+    def case(function: Callable[[npt.NDArray[Any]], Any]) -> Setup:
+        def setup(size: int) -> Benchmark:
+            data = _transactions(size)
+            return lambda: function(data)
+
+        return setup
+
+    cases: dict[str, Setup] = {
+        "task_2.generate_transactions_bulk": lambda size: lambda: _transactions(size),
+        "task_2.calculate_total_revenue": case(task_2.calculate_total_revenue),
+        "task_2.count_unique_users": case(task_2.count_unique_users),
+        "task_2.user_transaction_count": case(task_2.user_transaction_count),
+        "task_2.most_purchased_product": case(task_2.most_purchased_product),
+        "task_2.filter_transactions": case(task_2.filter_transactions),
+        "task_2.top_products": case(task_2.top_products),
+        "task_2.compare_revenue": case(lambda data: task_2.compare_revenue(data, start, now)),
+        "task_2.date_range_slicing": case(lambda data: task_2.date_range_slicing(data, start, now)),
+    }
+    for workers in _worker_counts():
+        cases[f"task_2.sharded_analysis[workers={workers}]"] = case(
+            functools.partial(task_2.sharded_analysis, workers=workers)
+        )
+    return cases
+
+
+def _task_3_cases() -> dict[str, Setup]:
+    def transpose(size: int) -> Benchmark:
+        array = _square_array(size)
+        return lambda: np.ascontiguousarray(task_3.transpose_array(array))
+
+    def reshape(size: int) -> Benchmark:
+        transposed = task_3.transpose_array(_square_array(size))
+        return lambda: task_3.reshape_array(transposed, (-1, 2 * transposed.shape[1]))
+
+    def blocked_transpose(size: int) -> Benchmark:
+        array = _square_array(size)
+        return lambda: task_3.transpose_array(array, materialize=True)
+
+    def blocked_reshape(size: int) -> Benchmark:
+        transposed = task_3.transpose_array(_square_array(size))
+        return lambda: task_3.reshape_array(transposed, (-1, 2 * transposed.shape[1]), blocked=True)
+
+    def split_combine(size: int) -> Benchmark:
+        array = _square_array(size)
+        return lambda: task_3.combine_arrays(task_3.split_array(array, 2))
+
+    def workflow(_: int) -> Benchmark:
+        return task_3.workflow
+
+    return {
+        "task_3.transpose_array": transpose,
+        "task_3.reshape_array": reshape,
+        "task_3.transpose_array[blocked]": blocked_transpose,
+        "task_3.reshape_array[blocked]": blocked_reshape,
+        "task_3.split_combine": split_combine,
+        "task_3.workflow": workflow,
+    }
+
+
+def _task_4_cases(directory: Path) -> dict[str, Setup]:
+    def aggregate(function: Callable[[npt.NDArray[Any]], Any]) -> Setup:
+        def setup(size: int) -> Benchmark:
+            array = _square_array(size)
+            return lambda: function(array)
+
+        return setup
+
+    def save(file_format: str) -> Setup:
+        def setup(size: int) -> Benchmark | None:
+            if file_format in {"txt", "csv"} and size > TEXT_FORMAT_SIZE_LIMIT:
+                return None
+            array = _square_array(size)
+            filename = str(directory / f"save_{file_format}_{size}")
+            return lambda: task_4.save_array(array, filename, (file_format,))
+
+        return setup
+
+    def load(file_format: str) -> Setup:
+        def setup(size: int) -> Benchmark | None:
+            if file_format in {"txt", "csv"} and size > TEXT_FORMAT_SIZE_LIMIT:
+                return None
+            filename = str(directory / f"load_{file_format}_{size}")
+            task_4.save_array(_square_array(size), filename, (file_format,))
+            return lambda: task_4.load_array(filename, file_format)
+
+        return setup
+
+    cases: dict[str, Setup] = {
+        "task_4.compute_sum": aggregate(task_4.compute_sum),
+        "task_4.compute_mean": aggregate(task_4.compute_mean),
+        "task_4.compute_median": aggregate(task_4.compute_median),
+        "task_4.compute_std": aggregate(task_4.compute_std),
+        "task_4.compute_aggregates": aggregate(task_4.compute_aggregates),
+        "task_4.compute_std_along_axis": aggregate(
+            lambda array: task_4.compute_std_along_axis(array, axis=0)
+        ),
+    }
+    for file_format in ("txt", "csv", "npy", "npz"):
+        cases[f"task_4.save_array[{file_format}]"] = save(file_format)
+        cases[f"task_4.load_array[{file_format}]"] = load(file_format)
+    return cases
+
+
+def _measure(benchmark: Benchmark, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        benchmark()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        benchmark()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = DEFAULT_SIZES, repeat: int = 3, pattern: str = ""
+) -> list[dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        cases = _task_2_cases() | _task_3_cases() | _task_4_cases(Path(directory))
+        for name, setup in cases.items():
+            if pattern not in name:
+                continue
+            for size in sizes:
+                benchmark = setup(size)
+                if benchmark is None:
+                    continue
+                seconds, peak = _measure(benchmark, repeat)
+                results.append(
+                    {
+                        "case": name,
+                        "size": size,
+                        "seconds": seconds,
+                        "peak_bytes": peak,
+                        "throughput": size / seconds if seconds else float("inf"),
+                    }
+                )
+                print(f"{name:<40} {size:>12,} {seconds * 1e3:>10.3f} ms {peak:>14,} B")
+    return results
+
+
+def compare_to_baseline(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float
+) -> list[str]:
+    expected = {(entry["case"], entry["size"]): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        reference = expected.get((entry["case"], entry["size"]))
+        if reference is None:
+            continue
+        label = f"{entry['case']} @ {entry['size']:,}"
+        if (
+            entry["seconds"] > NOISE_FLOOR_SECONDS
+            and entry["seconds"] > reference["seconds"] * tolerance
+        ):
+            regressions.append(
+                f"{label}: {entry['seconds']:.4f}s vs baseline {reference['seconds']:.4f}s"
+            )
+        if (
+            entry["peak_bytes"] > NOISE_FLOOR_BYTES
+            and entry["peak_bytes"] > reference["peak_bytes"] * tolerance
+        ):
+            regressions.append(
+                f"{label}: {entry['peak_bytes']:,} B vs baseline {reference['peak_bytes']:,} B"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default="", help="only run cases containing this text")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(size) for size in args.sizes)
+    results = run_benchmarks(sizes, args.repeat, args.filter)
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    output = args.baseline if args.save_baseline else args.output
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+    if args.save_baseline:
+        return 0
+    if not args.baseline.exists():
+        print(
+            f"WARNING no baseline at {args.baseline}, regressions were not checked; "
+            "run with --save-baseline to record one",
+            file=sys.stderr,
+        )
+        return 0
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Opt-in instrumentation for the public functions of the NumPy task modules.
+
+``instrument()`` temporarily replaces every public function of the given modules with
+a wrapper. The wrapper records call counts, wall time, bytes allocated (tracemalloc
+peak above the starting level) and whether returned arrays are copies or views of the
+array arguments. Outside the context manager the original functions are in place, so
+disabled instrumentation costs nothing.
+
+tracemalloc only has a process-wide peak, so allocations cannot be attributed to a call
+that overlaps with instrumented calls on other threads (for example ``load_arrays`` or
+``save_array(workers>1)``). Such calls are counted under ``overlapped`` instead of
+adding to ``allocated_bytes``; their timings are still recorded.
+
+    with instrument() as recorder:
+        task_3.workflow()
+    print(recorder.report())
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import numpy as np
+
+from numpy_tasks import task_2, task_3, task_4
+
+DEFAULT_MODULES = (task_2, task_3, task_4)
+
+
+def _arrays(value: Any) -> list[np.ndarray[Any, Any]]:
+    if isinstance(value, np.ndarray):
+        return [value]
+    if isinstance(value, list | tuple):
+        return [item for item in value if isinstance(item, np.ndarray)]
+    return []
+
+
+class Instrumentation:
+    def __init__(self, track_memory: bool = True) -> None:
+        self.track_memory = track_memory
+        self.stats: dict[str, dict[str, Any]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: set[int] = set()
+        self._epoch = 0
+
+    def _record(self, name: str) -> dict[str, Any]:
+        return self.stats.setdefault(
+            name,
+            {
+                "calls": 0,
+                "seconds": 0.0,
+                "allocated_bytes": 0,
+                "overlapped": 0,
+                "copies": 0,
+                "views": 0,
+            },
+        )
+
+    def _peaks(self) -> list[int]:
+        if not hasattr(self._local, "peaks"):
+            self._local.peaks = []
+        peaks: list[int] = self._local.peaks
+        return peaks
+
+    def _start_memory(self) -> tuple[int, int]:
+        if not self.track_memory:
+            return 0, 0
+        peaks = self._peaks()
+        with self._lock:
+            epoch = self._epoch
+            if not peaks:
+                self._threads.add(threading.get_ident())
+            if len(self._threads) > 1:
+                self._epoch += 1
+        current, peak = tracemalloc.get_traced_memory()
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak)
+        peaks.append(0)
+        tracemalloc.reset_peak()
+        return current, epoch
+
+    def _stop_memory(self, start: int, epoch: int) -> int | None:
+        if not self.track_memory:
+            return 0
+        peaks = self._peaks()
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, peaks.pop())
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak)
+        with self._lock:
+            overlapped = self._epoch != epoch
+            if not peaks:
+                self._threads.discard(threading.get_ident())
+        return None if overlapped else max(peak - start, 0)
+
+    def wrap(self, function: Callable[..., Any], name: str) -> Callable[..., Any]:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            memory_start, epoch = self._start_memory()
+            started = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                allocated = self._stop_memory(memory_start, epoch)
+                with self._lock:
+                    record = self._record(name)
+                    record["calls"] += 1
+                    record["seconds"] += elapsed
+                    if allocated is None:
+                        record["overlapped"] += 1
+                    else:
+                        record["allocated_bytes"] += allocated
+            inputs = _arrays(args) + _arrays(tuple(kwargs.values()))
+            views = sum(
+                any(np.may_share_memory(output, source) for source in inputs)
+                for output in _arrays(result)
+            )
+            with self._lock:
+                record["views"] += views
+                record["copies"] += len(_arrays(result)) - views
+            return result
+
+        return wrapper
+
+    def report(self) -> str:
+        lines = [
+            f"{'function':<40} {'calls':>6} {'seconds':>10} {'bytes':>14} overlapped copies views"
+        ]
+        for name, record in sorted(self.stats.items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(
+                f"{name:<40} {record['calls']:>6} {record['seconds']:>10.6f} "
+                f"{record['allocated_bytes']:>14,} {record['overlapped']:>10} "
+                f"{record['copies']:>6} {record['views']:>5}"
+            )
+        return "\n".join(lines)
+
+    def to_json(self, path: str | Path | None = None) -> str:
+        document = json.dumps(self.stats, indent=2, sort_keys=True)
+        if path is not None:
+            Path(path).write_text(document + "\n")
+        return document
+
+
+def public_functions(module: ModuleType) -> dict[str, Callable[..., Any]]:
+    return {
+        name: member
+        for name, member in vars(module).items()
+        if inspect.isfunction(member)
+        and not name.startswith("_")
+        and member.__module__ == module.__name__
+    }
+
+
+@contextmanager
+def instrument(
+    modules: tuple[ModuleType, ...] = DEFAULT_MODULES, track_memory: bool = True
+) -> Iterator[Instrumentation]:
+    recorder = Instrumentation(track_memory)
+    originals: list[tuple[ModuleType, str, Callable[..., Any]]] = []
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        for module in modules:
+            short_name = module.__name__.rsplit(".", 1)[-1]
+            for name, function in public_functions(module).items():
+                originals.append((module, name, function))
+                setattr(module, name, recorder.wrap(function, f"{short_name}.{name}"))
+        yield recorder
+    finally:
+        for module, name, function in originals:
+            setattr(module, name, function)
+        if started_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,114 @@
+"""Shared console output for the NumPy task modules.
+
+``print_array`` never builds the repr of a large array. Small arrays print in full;
+anything above ``SUMMARY_THRESHOLD`` elements prints a summary with shape, dtype,
+head/tail rows and min/max/mean, each computed once. ``write_array`` streams rows in
+blocks to any file-like object, and the "quiet" mode skips formatting completely so
+workflows can run at scale:
+
+    with output_mode("quiet"):
+        task_3.workflow(prints=True)
+"""
+
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import IO, Any, Literal
+
+import numpy as np
+import numpy.typing as npt
+
+OutputMode = Literal["auto", "full", "summary", "stream", "quiet"]
+OUTPUT_MODES: tuple[OutputMode, ...] = ("auto", "full", "summary", "stream", "quiet")
+SUMMARY_THRESHOLD = 1_000
+EDGE_ROWS = 3
+STREAM_BLOCK_ROWS = 4_096
+
+_settings: dict[str, OutputMode] = {"mode": "auto"}
+
+
+def get_output_mode() -> OutputMode:
+    return _settings["mode"]
+
+
+def set_output_mode(mode: OutputMode) -> None:
+    if mode not in OUTPUT_MODES:
+        msg = f"Unknown output mode {mode!r}, expected one of {OUTPUT_MODES}"
+        raise ValueError(msg)
+    _settings["mode"] = mode
+
+
+@contextmanager
+def output_mode(mode: OutputMode) -> Iterator[None]:
+    previous = get_output_mode()
+    set_output_mode(mode)
+    try:
+        yield
+    finally:
+        set_output_mode(previous)
+
+
+def _format_rows(rows: Any) -> str:
+    with np.printoptions(threshold=sys.maxsize, linewidth=sys.maxsize):
+        return np.array2string(np.asarray(rows), separator=" ")
+
+
+def array_stats(array: npt.NDArray[Any]) -> dict[str, Any] | None:
+    if array.size == 0 or not (
+        np.issubdtype(array.dtype, np.number) or np.issubdtype(array.dtype, np.bool_)
+    ):
+        return None
+    return {"min": array.min(), "max": array.max(), "mean": array.mean(dtype=np.float64)}
+
+
+def summarize_array(array: Any, edge_rows: int = EDGE_ROWS) -> str:
+    array = np.asanyarray(array)
+    lines = [f"shape={array.shape} dtype={array.dtype} size={array.size}"]
+    if array.ndim == 0:
+        lines.append(str(array))
+        return "\n".join(lines)
+    if len(array) <= 2 * edge_rows:
+        lines.append(_format_rows(array))
+    else:
+        lines.append(f"head:\n{_format_rows(array[:edge_rows])}")
+        lines.append(f"... {len(array) - 2 * edge_rows} rows omitted ...")
+        lines.append(f"tail:\n{_format_rows(array[-edge_rows:])}")
+    stats = array_stats(array)
+    if stats is not None:
+        lines.append(" ".join(f"{name}={value}" for name, value in stats.items()))
+    return "\n".join(lines)
+
+
+def write_array(
+    array: Any, file: IO[str] | None = None, block_rows: int = STREAM_BLOCK_ROWS
+) -> int:
+    file = sys.stdout if file is None else file
+    array = np.asanyarray(array)
+    if array.ndim == 0:
+        file.write(f"{array}\n")
+        return 1
+    rows = array.reshape(-1, array.shape[-1]) if array.ndim > 1 else array
+    for start in range(0, len(rows), block_rows):
+        block = rows[start : start + block_rows].tolist()
+        if rows.ndim > 1:
+            file.write("".join(" ".join(map(str, row)) + "\n" for row in block))
+        else:
+            file.write("".join(f"{row}\n" for row in block))
+    return len(rows)
+
+
+def print_array(
+    array: Any, message: str = "Array:", mode: OutputMode | None = None, file: IO[str] | None = None
+) -> None:
+    mode = get_output_mode() if mode is None else mode
+    if mode == "quiet":
+        return
+    file = sys.stdout if file is None else file
+    file.write(f"{message}\n")
+    if mode == "stream":
+        write_array(array, file)
+    elif mode == "summary" or (mode == "auto" and np.size(array) > SUMMARY_THRESHOLD):
+        file.write(f"{summarize_array(array)}\n")
+    else:
+        file.write(f"{array}\n")
+    file.write("\n")
@@ -33,15 +33,9 @@ A Python script (.py file) containing all the functions along with
     the code to create the initial arrays and execute all manipulations.
 """
 
-from typing import Any
-
 import numpy as np
-import numpy.typing as npt
-
-
-def print_array(array: npt.NDArray[Any], message: str = "Array:") -> None:
-    print(f"{message} {array}\n")
 
+from numpy_tasks.output import print_array
 
 if __name__ == "__main__":
     one_d_array = np.arange(1, 11)
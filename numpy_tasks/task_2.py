@@ -60,13 +60,27 @@ along with the code to create the initial array and execute all manipulations.
 """
 
 import datetime
-from typing import Any
+import itertools
+import math
+import os
+import sys
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Literal, cast
 
 import factory
 import numpy as np
 import numpy.typing as npt
 from faker import Faker
 
+from numpy_tasks.output import print_array
+from numpy_tasks.task_4 import atomic_write
+
 fake = Faker()
 
 
@@ -118,107 +132,1023 @@ def generate_transactions_array(num_transactions: int = 10) -> npt.NDArray[Any]:
     )
 
 
-def print_array(array: npt.NDArray[Any], message: str = "Array:") -> None:
-    print(f"{message}\n\n\n{array}\n")
+TRANSACTION_DTYPE = np.dtype(
+    [
+        ("transaction_id", np.int64),
+        ("user_id", np.int64),
+        ("product_id", np.int64),
+        ("quantity", np.int64),
+        ("price", np.float64),
+        ("timestamp", "datetime64[s]"),
+    ]
+)
+
+_OBJECT_COLUMN_TYPES: dict[str, npt.DTypeLike] = {
+    "transaction_id": int,
+    "user_id": int,
+    "product_id": int,
+    "quantity": int,
+    "price": float,
+    "timestamp": "datetime64[us]",
+}
+_OBJECT_COLUMNS = tuple(_OBJECT_COLUMN_TYPES)
+
+TRANSACTION_CENTS_DTYPE = np.dtype(
+    [
+        ("price_cents", np.int64) if name == "price" else (name, TRANSACTION_DTYPE[name])
+        for name in TRANSACTION_DTYPE.names or ()
+    ]
+)
+
+
+def is_structured(data: npt.NDArray[Any]) -> bool:
+    return data.dtype.names is not None
+
+
+def has_cents(data: npt.NDArray[Any]) -> bool:
+    return "price_cents" in (data.dtype.names or ())
+
+
+def to_structured_array(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    if has_cents(data):
+        structured = np.empty(data.shape[0], dtype=TRANSACTION_DTYPE)
+        for name in TRANSACTION_DTYPE.names or ():
+            structured[name] = column(data, name)
+        return structured
+    if is_structured(data):
+        return data.astype(TRANSACTION_DTYPE, copy=False)
+    structured = np.empty(data.shape[0], dtype=TRANSACTION_DTYPE)
+    for i, name in enumerate(_OBJECT_COLUMNS):
+        structured[name] = data[:, i].astype(TRANSACTION_DTYPE[name])
+    return structured
+
+
+def to_cents_array(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    if has_cents(data):
+        return data
+    cents = np.empty(data.shape[0], dtype=TRANSACTION_CENTS_DTYPE)
+    for name in TRANSACTION_DTYPE.names or ():
+        if name != "price":
+            cents[name] = column(data, name)
+    np.rint(column(data, "price") * 100, out=cents["price_cents"], casting="unsafe")
+    return cents
+
+
+def column(data: npt.NDArray[Any], name: str) -> npt.NDArray[Any]:
+    if name == "price" and has_cents(data):
+        return data["price_cents"] / 100
+    if is_structured(data):
+        return data[name]
+    return data[:, _OBJECT_COLUMNS.index(name)].astype(_OBJECT_COLUMN_TYPES[name])
+
+
+def _transaction_window(end_date: datetime.date | None) -> tuple[np.datetime64, np.datetime64]:
+    end = np.datetime64(end_date or datetime.date.today(), "s")
+    return end - np.timedelta64(6 * 7 * 24 * 3600, "s"), end
+
+
+def _fill_transactions(
+    out: npt.NDArray[Any],
+    first_transaction_id: int,
+    rng: np.random.Generator,
+    window: tuple[np.datetime64, np.datetime64],
+) -> None:
+    size = out.shape[0]
+    start, end = window
+    out["transaction_id"] = np.arange(first_transaction_id, first_transaction_id + size)
+    out["user_id"] = rng.integers(100, 105, size=size, endpoint=True)
+    out["product_id"] = rng.integers(40, 65, size=size, endpoint=True)
+    out["quantity"] = rng.integers(1, 10, size=size, endpoint=True)
+    out["price"] = rng.integers(1, 1000, size=size, endpoint=True)
+    seconds = (end - start).astype(np.int64)
+    offsets = rng.integers(0, seconds, size=size, endpoint=True).astype("timedelta64[s]")
+    out["timestamp"] = start + offsets
+
+
+def iter_transaction_chunks(
+    num_transactions: int,
+    chunk_size: int = 1_000_000,
+    seed: int | None = None,
+    end_date: datetime.date | None = None,
+) -> Iterator[npt.NDArray[Any]]:
+    if chunk_size <= 0:
+        msg = "chunk_size must be positive"
+        raise ValueError(msg)
+    rng = np.random.default_rng(seed)
+    window = _transaction_window(end_date)
+    for start in range(0, num_transactions, chunk_size):
+        chunk = np.empty(min(chunk_size, num_transactions - start), dtype=TRANSACTION_DTYPE)
+        _fill_transactions(chunk, start + 1, rng, window)
+        yield chunk
+
+
+def generate_transactions_bulk(
+    num_transactions: int = 10,
+    chunk_size: int = 1_000_000,
+    seed: int | None = None,
+    end_date: datetime.date | None = None,
+) -> npt.NDArray[Any]:
+    if chunk_size <= 0:
+        msg = "chunk_size must be positive"
+        raise ValueError(msg)
+    rng = np.random.default_rng(seed)
+    window = _transaction_window(end_date)
+    data = np.empty(num_transactions, dtype=TRANSACTION_DTYPE)
+    for start in range(0, num_transactions, chunk_size):
+        _fill_transactions(data[start : start + chunk_size], start + 1, rng, window)
+    return data
+
+
+GROUP_BY_AGGREGATIONS = ("sum", "count", "mean", "max")
+_DENSE_KEY_RANGE_LIMIT = 1 << 20
+
+
+def factorize(keys: npt.NDArray[Any]) -> tuple[npt.NDArray[Any], npt.NDArray[np.intp]]:
+    if keys.size and np.issubdtype(keys.dtype, np.integer):
+        low, high = int(keys.min()), int(keys.max())
+        if high - low < _DENSE_KEY_RANGE_LIMIT:
+            offsets = (keys - low).astype(np.intp, copy=False)
+            present = np.flatnonzero(np.bincount(offsets, minlength=high - low + 1))
+            lookup = np.empty(high - low + 1, dtype=np.intp)
+            lookup[present] = np.arange(present.size)
+            return (present + low).astype(keys.dtype), lookup[offsets]
+    uniques, codes = np.unique(keys, return_inverse=True)
+    return uniques, codes.reshape(-1)
+
+
+def _group_sum(codes: npt.NDArray[np.intp], values: npt.NDArray[Any], size: int) -> Any:
+    if np.issubdtype(values.dtype, np.integer):
+        sums = np.zeros(size, dtype=np.int64)
+        np.add.at(sums, codes, values)
+        return sums
+    return np.bincount(codes, weights=values, minlength=size)
+
+
+def _group_max(codes: npt.NDArray[np.intp], values: npt.NDArray[Any], size: int) -> Any:
+    if np.issubdtype(values.dtype, np.integer):
+        maxima = np.full(size, np.iinfo(values.dtype).min, dtype=values.dtype)
+    else:
+        maxima = np.full(size, -np.inf, dtype=np.result_type(values.dtype, np.float64))
+    np.maximum.at(maxima, codes, values)
+    return maxima
+
+
+def group_by(
+    keys: npt.NDArray[Any],
+    values: Mapping[str, npt.NDArray[Any]] | None = None,
+    aggregations: Sequence[str] = GROUP_BY_AGGREGATIONS,
+) -> dict[str, npt.NDArray[Any]]:
+    unknown = set(aggregations) - set(GROUP_BY_AGGREGATIONS)
+    if unknown:
+        msg = f"Unsupported aggregations: {sorted(unknown)}"
+        raise ValueError(msg)
+
+    uniques, codes = factorize(keys)
+    counts = np.bincount(codes, minlength=uniques.size)
+    result: dict[str, npt.NDArray[Any]] = {"key": uniques}
+    if "count" in aggregations:
+        result["count"] = counts
+
+    for name, value_column in (values or {}).items():
+        if "sum" in aggregations or "mean" in aggregations:
+            sums = _group_sum(codes, value_column, uniques.size)
+            if "sum" in aggregations:
+                result[f"{name}_sum"] = sums
+            if "mean" in aggregations:
+                result[f"{name}_mean"] = sums / counts
+        if "max" in aggregations:
+            result[f"{name}_max"] = _group_max(codes, value_column, uniques.size)
+    return result
+
+
+DistinctMethod = Literal["auto", "bitmap", "hash", "sort", "hll"]
+HLL_PRECISION = 14
+HLL_PRECISION_RANGE = range(4, 19)
+_HASH_BITS = 64
+
+
+def _splitmix64(values: npt.NDArray[Any]) -> npt.NDArray[np.uint64]:
+    hashed = np.asarray(values).astype(np.int64).view(np.uint64)
+    hashed = hashed + np.uint64(0x9E3779B97F4A7C15)
+    hashed = (hashed ^ (hashed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    hashed = (hashed ^ (hashed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return hashed ^ (hashed >> np.uint64(31))
+
+
+def _bit_length(values: npt.NDArray[np.uint64]) -> npt.NDArray[np.int64]:
+    lengths = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        lengths += high * shift
+        values = np.where(high, values >> np.uint64(shift), values)
+    return lengths + (values > 0)
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = HLL_PRECISION) -> None:
+        if precision not in HLL_PRECISION_RANGE:
+            msg = "precision must be between 4 and 18"
+            raise ValueError(msg)
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: npt.NDArray[Any]) -> "HyperLogLog":
+        hashed = _splitmix64(values)
+        width = _HASH_BITS - self.precision
+        indices = (hashed >> np.uint64(width)).astype(np.intp)
+        remainder = hashed & np.uint64((1 << width) - 1)
+        ranks = (width - _bit_length(remainder) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, indices, ranks)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            msg = "cannot merge sketches with different precision"
+            raise ValueError(msg)
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        size = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(float(estimate))
+
+
+def count_distinct(values: npt.NDArray[Any], method: DistinctMethod = "auto") -> int:
+    if method == "auto":
+        dense = np.issubdtype(values.dtype, np.integer) and values.size > 0
+        if dense:
+            span = int(values.max()) - int(values.min()) + 1
+            dense = span <= max(_DENSE_KEY_RANGE_LIMIT, 8 * values.size)
+        method = "bitmap" if dense else "hash"
+    if values.size == 0:
+        return 0
+    if method == "bitmap":
+        low = int(values.min())
+        seen = np.zeros(int(values.max()) - low + 1, dtype=np.bool_)
+        seen[values - low] = True
+        return int(np.count_nonzero(seen))
+    if method == "hash":
+        return len(set(values.tolist()))
+    if method == "hll":
+        return HyperLogLog().update(values).count()
+    return len(np.unique(values))
+
+
+def _grow_bitmap(
+    bitmap: npt.NDArray[np.bool_], low: int, values: npt.NDArray[Any]
+) -> tuple[npt.NDArray[np.bool_], int]:
+    new_low = min(low, int(values.min())) if bitmap.size else int(values.min())
+    new_high = max(low + bitmap.size - 1, int(values.max())) if bitmap.size else int(values.max())
+    if bitmap.size and new_low == low and new_high == low + bitmap.size - 1:
+        return bitmap, low
+    grown = np.zeros(new_high - new_low + 1, dtype=np.bool_)
+    grown[low - new_low : low - new_low + bitmap.size] = bitmap
+    return grown, new_low
+
+
+def _count_distinct_chunks(chunks: Iterable[npt.NDArray[Any]], method: DistinctMethod) -> int:
+    if method == "hash":
+        seen: set[Any] = set()
+        for values in chunks:
+            seen.update(values.tolist())
+        return len(seen)
+    if method == "bitmap":
+        bitmap, low = np.zeros(0, dtype=np.bool_), 0
+        for values in chunks:
+            if values.size:
+                bitmap, low = _grow_bitmap(bitmap, low, values)
+                bitmap[values - low] = True
+        return int(np.count_nonzero(bitmap))
+    uniques = np.unique if method == "sort" else (lambda values: factorize(values)[0])
+    distinct = np.empty(0, dtype=np.int64)
+    for values in chunks:
+        distinct = np.union1d(distinct, uniques(values))
+    return len(distinct)
+
+
+def top_k(values: npt.NDArray[Any], k: int) -> npt.NDArray[np.intp]:
+    if k < 0:
+        msg = f"k must be non-negative, got {k}"
+        raise ValueError(msg)
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if values.shape[0] <= k:
+        return np.argsort(values, kind="stable")
+    top = np.argpartition(values, -k)[-k:]
+    return top[np.argsort(values[top], kind="stable")]
+
+
+def _as_datetime64(values: Any, unit_dtype: np.dtype[Any], ceil: bool) -> npt.NDArray[Any]:
+    original = np.asarray(values, dtype="datetime64[us]")
+    converted = original.astype(unit_dtype)
+    if ceil:
+        step = np.array(1).astype(f"timedelta64[{np.datetime_data(unit_dtype)[0]}]")
+        converted = np.where(converted < original, converted + step, converted)
+    return converted
+
+
+TransactionSource = npt.NDArray[Any] | Iterable[npt.NDArray[Any]]
+
+
+class TimeIndex:
+    def __init__(self, data: npt.NDArray[Any]) -> None:
+        self.version = dataset_version(data)
+        timestamps = column(data, "timestamp")
+        if np.all(timestamps[:-1] <= timestamps[1:]):
+            self.order = np.arange(timestamps.shape[0])
+            self.data = data
+        else:
+            self.order = np.argsort(timestamps, kind="stable")
+            self.data = data[self.order]
+            timestamps = timestamps[self.order]
+        self.timestamps = timestamps
+        revenues = column(self.data, "quantity") * column(self.data, "price")
+        self.revenue_cumsum = np.concatenate(([0.0], np.cumsum(revenues, dtype=np.float64)))
+
+    def validate(self, data: TransactionSource) -> None:
+        if not isinstance(data, np.ndarray) or dataset_version(data) != self.version:
+            msg = "time index is stale or built for other data, rebuild it with build_time_index"
+            raise ValueError(msg)
+
+    def bounds(self, starts: Any, ends: Any) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+        lows = np.searchsorted(
+            self.timestamps, _as_datetime64(starts, self.timestamps.dtype, ceil=True), "left"
+        )
+        highs = np.searchsorted(
+            self.timestamps, _as_datetime64(ends, self.timestamps.dtype, ceil=False), "right"
+        )
+        return lows, np.maximum(lows, highs)
+
+    def slice(self, start_date: datetime.datetime, end_date: datetime.datetime) -> npt.NDArray[Any]:
+        low, high = self.bounds(start_date, end_date)
+        return self.data[int(low) : int(high)]
+
+    def counts(self, starts: Any, ends: Any) -> npt.NDArray[np.intp]:
+        lows, highs = self.bounds(starts, ends)
+        return highs - lows
+
+    def revenues(self, starts: Any, ends: Any) -> npt.NDArray[np.float64]:
+        lows, highs = self.bounds(starts, ends)
+        return self.revenue_cumsum[highs] - self.revenue_cumsum[lows]
+
+
+def build_time_index(data: npt.NDArray[Any]) -> TimeIndex:
+    return TimeIndex(data)
+
+
+RoundingMode = Literal["half_even", "half_up", "floor", "ceil"]
+_MAX_EXACT_PRODUCT = 1 << 62
 
 
-def calculate_total_revenue(data: npt.NDArray[Any]) -> float:
-    quantities = data[:, 3].astype(float)
-    prices = data[:, 4].astype(float)
-    total_revenue: float = np.sum(quantities * prices)
+def _price_factor(percentages: float | Sequence[float]) -> Fraction:
+    steps = [percentages] if np.ndim(percentages) == 0 else cast(Sequence[float], percentages)
+    return math.prod((1 + Fraction(str(step)) / 100 for step in steps), start=Fraction(1))
+
+
+def _round_quotient(
+    quotient: npt.NDArray[np.int64],
+    remainder: npt.NDArray[np.int64],
+    denominator: int,
+    rounding: RoundingMode,
+) -> None:
+    if rounding == "floor":
+        return
+    if rounding == "ceil":
+        np.add(quotient, remainder > 0, out=quotient, casting="unsafe")
+        return
+    np.multiply(remainder, 2, out=remainder)
+    round_up = remainder > denominator
+    if rounding == "half_up":
+        round_up |= remainder == denominator
+    else:
+        round_up |= (remainder == denominator) & (quotient % 2 == 1)
+    np.add(quotient, round_up, out=quotient, casting="unsafe")
+
+
+def adjust_prices(
+    data: npt.NDArray[Any],
+    percentages: float | Sequence[float] | Mapping[int, float | Sequence[float]],
+    by: str | None = None,
+    rounding: RoundingMode = "half_even",
+) -> npt.NDArray[Any]:
+    if not has_cents(data):
+        msg = "adjust_prices expects integer-cents data, see to_cents_array"
+        raise ValueError(msg)
+    cents = data["price_cents"]
+
+    if by is None:
+        if isinstance(percentages, Mapping):
+            msg = "per-key percentages require by='product_id' or by='user_id'"
+            raise ValueError(msg)
+        factor = _price_factor(percentages)
+        numerators: Any = factor.numerator
+        denominator = factor.denominator
+    else:
+        if not isinstance(percentages, Mapping):
+            msg = "by= requires a mapping from key to percentages"
+            raise ValueError(msg)
+        keys, codes = factorize(data[by])
+        factors = [_price_factor(percentages.get(int(key), 0)) for key in keys]
+        denominator = math.lcm(*(factor.denominator for factor in factors))
+        scaled = [factor.numerator * (denominator // factor.denominator) for factor in factors]
+        numerators = np.array(scaled, dtype=np.int64)[codes]
+
+    if cents.size and int(np.abs(cents).max()) * int(np.max(numerators)) >= _MAX_EXACT_PRODUCT:
+        msg = "price adjustment would overflow int64 cents"
+        raise OverflowError(msg)
+    mark_mutated(data)
+    product = np.multiply(cents, numerators, dtype=np.int64)
+    np.divmod(product, denominator, out=(cents, product))
+    _round_quotient(cents, product, denominator, rounding)
+    return data
+
+
+def _merge_group_sums(
+    keys: npt.NDArray[Any],
+    sums: npt.NDArray[Any],
+    chunk_keys: npt.NDArray[Any],
+    chunk_sums: npt.NDArray[Any],
+) -> tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+    merged = group_by(
+        np.concatenate((keys, chunk_keys)),
+        {"value": np.concatenate((sums, chunk_sums))},
+        ("sum",),
+    )
+    return merged["key"], merged["value_sum"]
+
+
+def _product_revenues(data: TransactionSource) -> tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+    if not isinstance(data, np.ndarray):
+        products = np.empty(0, dtype=np.int64)
+        revenues = np.empty(0, dtype=np.float64)
+        for chunk in data:
+            products, revenues = _merge_group_sums(products, revenues, *_product_revenues(chunk))
+        return products, revenues
+    chunk_revenues = (column(data, "quantity") * column(data, "price")).astype(np.float64)
+    groups = group_by(column(data, "product_id"), {"revenue": chunk_revenues}, ("sum",))
+    return groups["key"], groups["revenue_sum"]
+
+
+def calculate_total_revenue(data: TransactionSource) -> float:
+    if not isinstance(data, np.ndarray):
+        return float(sum(calculate_total_revenue(chunk) for chunk in data))
+    if has_cents(data):
+        return int(np.sum(data["quantity"] * data["price_cents"])) / 100
+    total_revenue: float = np.sum(column(data, "quantity") * column(data, "price"))
     return total_revenue
 
 
-def count_unique_users(data: npt.NDArray[Any]) -> int:
-    unique_users = np.unique(data[:, 1])
-    return len(unique_users)
+def count_unique_users(
+    data: TransactionSource,
+    method: DistinctMethod = "auto",
+    precision: int = HLL_PRECISION,
+) -> int:
+    if method == "hll":
+        sketch = HyperLogLog(precision)
+        for chunk in [data] if isinstance(data, np.ndarray) else data:
+            sketch.update(column(chunk, "user_id"))
+        return sketch.count()
+    if not isinstance(data, np.ndarray):
+        return _count_distinct_chunks((column(chunk, "user_id") for chunk in data), method)
+    return count_distinct(column(data, "user_id"), method)
 
 
 def most_purchased_product(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
-    products, quantities = np.unique(data[:, 2], return_counts=True)
-    max_index = np.argmax(quantities)
-    return products[max_index]  # type: ignore[no-any-return]
+    groups = group_by(column(data, "product_id"), aggregations=("count",))
+    max_index = np.argmax(groups["count"])
+    return groups["key"][max_index]  # type: ignore[no-any-return]
 
 
 def convert_price_to_int(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    mark_mutated(data)
+    if has_cents(data):
+        data["price_cents"] -= np.fmod(data["price_cents"], 100)
+        return data
+    if is_structured(data):
+        np.trunc(data["price"], out=data["price"])
+        return data
     data[:, 4] = data[:, 4].astype(float).astype(int)
     return data
 
 
 def check_data_types(data: npt.NDArray[Any]) -> list[Any]:
+    if is_structured(data):
+        return [(i, data.dtype[name].type) for i, name in enumerate(data.dtype.names or ())]
     return [(i, type(data[0, i])) for i in range(data.shape[1])]
 
 
 def product_quantity_array(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    if is_structured(data):
+        return data[["product_id", "quantity"]]
     return data[:, [2, 3]]
 
 
-def user_transaction_count(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
-    users, counts = np.unique(data[:, 1], return_counts=True)
-    return np.column_stack((users, counts))
+def user_transaction_count(data: TransactionSource) -> npt.NDArray[Any]:
+    if not isinstance(data, np.ndarray):
+        users = np.empty(0, dtype=np.int64)
+        counts = np.empty(0, dtype=np.int64)
+        for chunk in data:
+            partial = user_transaction_count(chunk)
+            users, counts = _merge_group_sums(users, counts, partial[:, 0], partial[:, 1])
+        return np.column_stack((users, counts))
+    groups = group_by(column(data, "user_id"), aggregations=("count",))
+    return np.column_stack((groups["key"], groups["count"]))
 
 
 def masked_array(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
-    mask = data[:, 3].astype(int) > 0
+    mask = column(data, "quantity") > 0
     return data[mask]
 
 
 def increase_prices(data: npt.NDArray[Any], percentage: int) -> npt.NDArray[Any]:
+    if has_cents(data):
+        return adjust_prices(data, percentage)
+    mark_mutated(data)
+    if is_structured(data):
+        data["price"] *= 1 + percentage / 100
+        return data
     data[:, 4] = data[:, 4].astype(float) * (1 + percentage / 100)
     return data
 
 
 def filter_transactions(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
-    return data[data[:, 3].astype(int) > 1]
+    return data[column(data, "quantity") > 1]
 
 
 def compare_revenue(
-    data: npt.NDArray[Any], start_date: datetime.datetime, end_date: datetime.datetime
+    data: TransactionSource,
+    start_date: datetime.datetime,
+    end_date: datetime.datetime,
+    index: TimeIndex | None = None,
 ) -> float:
+    if index is not None:
+        index.validate(data)
+        return float(index.revenues(start_date, end_date))
+    if not isinstance(data, np.ndarray):
+        return float(sum(compare_revenue(chunk, start_date, end_date) for chunk in data))
     start_date_np = np.datetime64(start_date)
     end_date_np = np.datetime64(end_date)
-    mask = (data[:, 5] >= start_date_np) & (data[:, 5] <= end_date_np)
+    timestamps = column(data, "timestamp")
+    mask = (timestamps >= start_date_np) & (timestamps <= end_date_np)
     filtered_data = data[mask]
     return calculate_total_revenue(filtered_data)
 
 
 def user_transactions(data: npt.NDArray[Any], user_id: int) -> npt.NDArray[Any]:
-    return data[data[:, 1] == user_id]  # type: ignore[no-any-return]
+    return data[column(data, "user_id") == user_id]  # type: ignore[no-any-return]
 
 
 def date_range_slicing(
-    data: npt.NDArray[Any], start_date: datetime.datetime, end_date: datetime.datetime
+    data: npt.NDArray[Any],
+    start_date: datetime.datetime,
+    end_date: datetime.datetime,
+    index: TimeIndex | None = None,
 ) -> npt.NDArray[Any]:
+    if index is not None:
+        index.validate(data)
+        return index.slice(start_date, end_date)
     start_date_np = np.datetime64(start_date)
     end_date_np = np.datetime64(end_date)
-    mask = (data[:, 5] >= start_date_np) & (data[:, 5] <= end_date_np)
+    timestamps = column(data, "timestamp")
+    mask = (timestamps >= start_date_np) & (timestamps <= end_date_np)
     return data[mask]
 
 
-def top_products(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
-    unique_products = np.unique(data[:, 2])
+def top_products(data: TransactionSource, k: int = 5) -> npt.NDArray[Any]:
+    products, revenues = _product_revenues(data)
+    top_indices = top_k(revenues, k)
+    return np.column_stack((products[top_indices], revenues[top_indices]))
+
+
+def _accumulate_groups(
+    keys: npt.NDArray[Any],
+    sums: dict[str, npt.NDArray[Any]],
+    batch_keys: npt.NDArray[Any],
+    batch_values: Mapping[str, npt.NDArray[Any]],
+) -> tuple[npt.NDArray[Any], dict[str, npt.NDArray[Any]]]:
+    groups = group_by(batch_keys, batch_values, ("sum", "count"))
+    batch_sums = {"count": groups["count"]} | {name: groups[f"{name}_sum"] for name in batch_values}
+    positions = np.searchsorted(keys, groups["key"])
+    if np.all(positions < keys.size) and np.array_equal(keys[positions], groups["key"]):
+        for name, values in batch_sums.items():
+            sums[name][positions] += values
+        return keys, sums
+    merged_keys = np.union1d(keys, groups["key"])
+    merged: dict[str, npt.NDArray[Any]] = {}
+    for name, values in batch_sums.items():
+        merged[name] = np.zeros(merged_keys.size, dtype=values.dtype)
+        merged[name][np.searchsorted(merged_keys, keys)] = sums[name]
+        merged[name][np.searchsorted(merged_keys, groups["key"])] += values
+    return merged_keys, merged
+
+
+class TransactionAggregates:
+    def __init__(self) -> None:
+        self.transactions = 0
+        self.revenue = 0.0
+        self.user_ids = np.empty(0, dtype=np.int64)
+        self.user_sums = {"count": np.empty(0, dtype=np.int64)}
+        self.product_ids = np.empty(0, dtype=np.int64)
+        self.product_sums = {
+            "count": np.empty(0, dtype=np.int64),
+            "quantity": np.empty(0, dtype=np.int64),
+            "revenue": np.empty(0, dtype=np.float64),
+        }
+
+    def ingest(self, batch: npt.NDArray[Any]) -> "TransactionAggregates":
+        if not len(batch):
+            return self
+        quantities = column(batch, "quantity").astype(np.int64)
+        if has_cents(batch):
+            cents = quantities * batch["price_cents"]
+            self.revenue += int(cents.sum()) / 100
+            revenues = cents / 100
+        else:
+            revenues = (quantities * column(batch, "price")).astype(np.float64)
+            self.revenue += float(revenues.sum())
+        self.transactions += len(batch)
+        self.user_ids, self.user_sums = _accumulate_groups(
+            self.user_ids, self.user_sums, column(batch, "user_id").astype(np.int64), {}
+        )
+        self.product_ids, self.product_sums = _accumulate_groups(
+            self.product_ids,
+            self.product_sums,
+            column(batch, "product_id").astype(np.int64),
+            {"quantity": quantities, "revenue": revenues},
+        )
+        return self
 
-    total_revenues = np.zeros(unique_products.shape)
+    def total_revenue(self) -> float:
+        return self.revenue
 
-    for i, product in enumerate(unique_products):
-        product_mask = data[:, 2] == product
-        product_data = data[product_mask]
+    def unique_users(self) -> int:
+        return int(self.user_ids.size)
 
-        quantities = product_data[:, 3].astype(float)
-        prices = product_data[:, 4].astype(float)
-        total_revenues[i] = np.sum(quantities * prices)
+    def user_transaction_count(self) -> npt.NDArray[Any]:
+        return np.column_stack((self.user_ids, self.user_sums["count"]))
 
-    top_indices = np.argsort(total_revenues)[-5:]
-    top_products = unique_products[top_indices]
-    top_revenues = total_revenues[top_indices]
+    def most_purchased_product(self) -> npt.NDArray[Any]:
+        return self.product_ids[np.argmax(self.product_sums["count"])]  # type: ignore[no-any-return]
 
-    return np.column_stack((top_products, top_revenues))
+    def top_products(self, k: int = 5) -> npt.NDArray[Any]:
+        top_indices = top_k(self.product_sums["revenue"], k)
+        return np.column_stack(
+            (self.product_ids[top_indices], self.product_sums["revenue"][top_indices])
+        )
+
+    def snapshot(self, path: str | Path) -> None:
+        arrays: dict[str, Any] = {
+            "transactions": np.int64(self.transactions),
+            "revenue": np.float64(self.revenue),
+            "user_ids": self.user_ids,
+            "product_ids": self.product_ids,
+        }
+        arrays.update({f"user_{name}": values for name, values in self.user_sums.items()})
+        arrays.update({f"product_{name}": values for name, values in self.product_sums.items()})
+        with atomic_write(Path(path)) as file:
+            np.savez(file, **arrays)
+
+    @classmethod
+    def restore(cls, path: str | Path) -> "TransactionAggregates":
+        aggregates = cls()
+        with np.load(path) as saved:
+            aggregates.transactions = int(saved["transactions"])
+            aggregates.revenue = float(saved["revenue"])
+            aggregates.user_ids = saved["user_ids"]
+            aggregates.product_ids = saved["product_ids"]
+            aggregates.user_sums = {name: saved[f"user_{name}"] for name in aggregates.user_sums}
+            aggregates.product_sums = {
+                name: saved[f"product_{name}"] for name in aggregates.product_sums
+            }
+        return aggregates
+
+
+def aggregate_transactions(data: TransactionSource) -> TransactionAggregates:
+    aggregates = TransactionAggregates()
+    for chunk in [data] if isinstance(data, np.ndarray) else data:
+        aggregates.ingest(chunk)
+    return aggregates
+
+
+QueryOperator = Literal["==", "!=", "<", "<=", ">", ">=", "in"]
+_QUERY_UFUNCS: dict[str, np.ufunc] = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+QUERY_BLOCK_ROWS = 1 << 16
+
+
+class TransactionQuery:
+    def __init__(self, data: npt.NDArray[Any], index: TimeIndex | None = None) -> None:
+        self.data = data
+        self.index = index
+        self.predicates: list[tuple[str, QueryOperator, Any]] = []
+        self.time_range: tuple[datetime.datetime, datetime.datetime] | None = None
+
+    def where(self, name: str, operator: QueryOperator, value: Any) -> "TransactionQuery":
+        if operator != "in" and operator not in _QUERY_UFUNCS:
+            msg = f"Unsupported query operator {operator!r}"
+            raise ValueError(msg)
+        if name == "timestamp" and operator != "in":
+            value = np.datetime64(value)
+        self.predicates.append((name, operator, value))
+        return self
+
+    def between(self, start: datetime.datetime, end: datetime.datetime) -> "TransactionQuery":
+        if self.index is None:
+            return self.where("timestamp", ">=", start).where("timestamp", "<=", end)
+        self.time_range = (start, end)
+        return self
+
+    def _candidates(self) -> tuple[npt.NDArray[Any], int, int]:
+        if self.index is None:
+            return self.data, 0, len(self.data)
+        self.index.validate(self.data)
+        if self.time_range is None:
+            return self.index.data, 0, len(self.index.data)
+        low, high = self.index.bounds(*self.time_range)
+        return self.index.data, int(low), int(high)
+
+    def mask(self) -> tuple[npt.NDArray[Any], int, npt.NDArray[np.bool_]]:
+        rows, low, high = self._candidates()
+        mask = np.ones(high - low, dtype=np.bool_)
+        scratch = np.empty(min(QUERY_BLOCK_ROWS, high - low), dtype=np.bool_)
+        for start in range(low, high, QUERY_BLOCK_ROWS):
+            block = rows[start : min(start + QUERY_BLOCK_ROWS, high)]
+            block_mask = mask[start - low : start - low + len(block)]
+            for name, operator, value in self.predicates:
+                values = column(block, name)
+                if operator == "in":
+                    block_mask &= np.isin(values, value)
+                else:
+                    _QUERY_UFUNCS[operator](values, value, out=scratch[: len(block)])
+                    block_mask &= scratch[: len(block)]
+        return rows, low, mask
+
+    def indices(self) -> npt.NDArray[np.intp]:
+        _, low, mask = self.mask()
+        positions = np.flatnonzero(mask) + low
+        return positions if self.index is None else self.index.order[positions]
+
+    def rows(self, columns: Sequence[str] | None = None, view: bool = False) -> npt.NDArray[Any]:
+        rows, low, mask = self.mask()
+        positions = np.flatnonzero(mask)
+        if view:
+            if positions.size and positions[-1] - positions[0] + 1 != positions.size:
+                msg = "selected rows are not contiguous, use indices() or view=False"
+                raise ValueError(msg)
+            start = low + (int(positions[0]) if positions.size else 0)
+            return _project(rows[start : start + positions.size], columns)
+        return _take(rows, positions + low, columns)
+
+
+def _project(rows: npt.NDArray[Any], columns: Sequence[str] | None) -> npt.NDArray[Any]:
+    if columns is None:
+        return rows
+    if is_structured(rows):
+        return rows[list(columns)]
+    return rows[:, [_OBJECT_COLUMNS.index(name) for name in columns]]
+
+
+def _take(
+    rows: npt.NDArray[Any], positions: npt.NDArray[np.intp], columns: Sequence[str] | None
+) -> npt.NDArray[Any]:
+    if columns is None:
+        return rows[positions]
+    if not is_structured(rows):
+        return rows[np.ix_(positions, [_OBJECT_COLUMNS.index(name) for name in columns])]  # type: ignore[no-any-return]
+    selected = np.empty(positions.size, dtype=[(name, rows.dtype[name]) for name in columns])
+    for name in columns:
+        np.take(rows[name], positions, out=selected[name])
+    return selected
+
+
+def query_transactions(data: npt.NDArray[Any], index: TimeIndex | None = None) -> TransactionQuery:
+    return TransactionQuery(data, index)
+
+
+ShardKey = Literal["user_id", "product_id"]
+
+
+def partition_by_key(
+    data: npt.NDArray[Any], by: ShardKey, shards: int
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    shard_ids = (_splitmix64(column(data, by)) % np.uint64(shards)).astype(np.intp)
+    order = np.argsort(shard_ids, kind="stable")
+    offsets = np.zeros(shards + 1, dtype=np.intp)
+    np.cumsum(np.bincount(shard_ids, minlength=shards), out=offsets[1:])
+    return order, offsets
+
+
+def _analyze_shard(shard: npt.NDArray[Any], by: ShardKey, k: int) -> dict[str, Any]:
+    users = group_by(column(shard, "user_id"), aggregations=("count",))
+    products, revenues = _product_revenues(shard)
+    if by == "product_id":
+        top_indices = top_k(revenues, k)
+        products, revenues = products[top_indices], revenues[top_indices]
+    return {
+        "revenue": calculate_total_revenue(shard),
+        "users": users["key"],
+        "user_counts": users["count"],
+        "products": products,
+        "product_revenues": revenues,
+    }
+
+
+def _analyze_shared_shard(
+    spec: tuple[str, int, Any, tuple[int, int], ShardKey, int],
+) -> dict[str, Any]:
+    name, rows, descr, (start, stop), by, k = spec
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        data: npt.NDArray[Any] = np.ndarray(rows, dtype=np.dtype(descr), buffer=shared.buf)
+        result = _analyze_shard(data[start:stop], by, k)
+        del data
+        return result
+    finally:
+        shared.close()
+
+
+def _merge_shard_results(parts: list[dict[str, Any]], by: ShardKey, k: int) -> dict[str, Any]:
+    users = np.concatenate([part["users"] for part in parts])
+    user_counts = np.concatenate([part["user_counts"] for part in parts])
+    products = np.concatenate([part["products"] for part in parts])
+    revenues = np.concatenate([part["product_revenues"] for part in parts])
+    if by == "user_id":
+        order = np.argsort(users, kind="stable")
+        users, user_counts = users[order], user_counts[order]
+        products, revenues = _merge_group_sums(products[:0], revenues[:0], products, revenues)
+    else:
+        users, user_counts = _merge_group_sums(users[:0], user_counts[:0], users, user_counts)
+    top_indices = top_k(revenues, k)
+    return {
+        "total_revenue": float(sum(part["revenue"] for part in parts)),
+        "unique_users": int(users.size),
+        "user_transaction_count": np.column_stack((users, user_counts)),
+        "top_products": np.column_stack((products[top_indices], revenues[top_indices])),
+    }
+
+
+def sharded_analysis(
+    data: npt.NDArray[Any],
+    by: ShardKey = "user_id",
+    workers: int | None = None,
+    k: int = 5,
+) -> dict[str, Any]:
+    workers = workers or os.cpu_count() or 1
+    if not is_structured(data):
+        data = to_structured_array(data)
+    order, offsets = partition_by_key(data, by, workers)
+    bounds = list(itertools.pairwise(offsets.tolist()))
+    if workers <= 1:
+        partitioned = data[order]
+        return _merge_shard_results(
+            [_analyze_shard(partitioned[start:stop], by, k) for start, stop in bounds], by, k
+        )
+
+    shared = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        staged: npt.NDArray[Any] = np.ndarray(data.shape, dtype=data.dtype, buffer=shared.buf)
+        np.take(data, order, out=staged)
+        del staged
+        specs = [(shared.name, len(data), data.dtype.descr, bound, by, k) for bound in bounds]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_analyze_shared_shard, specs))
+    finally:
+        shared.close()
+        shared.unlink()
+    return _merge_shard_results(parts, by, k)
+
+
+_dataset_tokens = itertools.count()
+_dataset_versions: dict[int, list[int]] = {}
+
+
+def _root_array(data: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    while isinstance(data.base, np.ndarray):
+        data = data.base
+    return data
+
+
+def _dataset_state(data: npt.NDArray[Any]) -> list[int]:
+    root = _root_array(data)
+    state = _dataset_versions.get(id(root))
+    if state is None:
+        state = _dataset_versions[id(root)] = [next(_dataset_tokens), 0]
+        weakref.finalize(root, _dataset_versions.pop, id(root), None)
+    return state
+
+
+def dataset_version(data: npt.NDArray[Any]) -> tuple[Any, ...]:
+    token, version = _dataset_state(data)
+    layout = data.__array_interface__
+    return token, version, layout["data"][0], data.shape, layout["strides"], data.dtype
+
+
+def mark_mutated(data: npt.NDArray[Any]) -> None:
+    _dataset_state(data)[1] += 1
+
+
+def _result_nbytes(result: Any) -> int:
+    if isinstance(result, np.ndarray):
+        return int(result.nbytes)
+    if isinstance(result, tuple | list):
+        return sum(_result_nbytes(item) for item in result)
+    return sys.getsizeof(result)
+
+
+def _freeze_result(result: Any) -> Any:
+    if isinstance(result, np.ndarray):
+        result = result.view()
+        result.flags.writeable = False
+    return result
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = 64 << 20) -> None:
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[tuple[Any, ...], tuple[Any, int]] = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def call(
+        self,
+        function: Callable[..., Any],
+        data: npt.NDArray[Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        key = (function, dataset_version(data), args, tuple(sorted(kwargs.items())))
+        try:
+            cached = self.entries.get(key)
+        except TypeError:
+            self.misses += 1
+            return function(data, *args, **kwargs)
+        if cached is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return cached[0]
+        self.misses += 1
+        self._drop_stale(key[1])
+        result = _freeze_result(function(data, *args, **kwargs))
+        size = _result_nbytes(result)
+        if size <= self.max_bytes:
+            self.entries[key] = (result, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+        return result
+
+    def _drop_stale(self, version: tuple[Any, ...]) -> None:
+        for key in list(self.entries):
+            if key[1][0] == version[0] and key[1][1] != version[1]:
+                self.nbytes -= self.entries.pop(key)[1]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+        }
 
 
 if __name__ == "__main__":
     transaction_data = generate_transactions_array(20)
     print_array(transaction_data, "Initial Transaction Data:")
 
+    structured_data = to_structured_array(transaction_data)
+    print_array(structured_data, "Structured Transaction Data:")
+    assert structured_data.shape == (transaction_data.shape[0],), "Row count should be preserved."
+
+    cents_data = adjust_prices(to_cents_array(structured_data), [5, -2], rounding="half_up")
+    print(f"Revenue after +5% then -2% (exact cents): {calculate_total_revenue(cents_data)}\n")
+
+    bulk_data = generate_transactions_bulk(1_000_000, seed=42)
+    print(f"Bulk generated {bulk_data.shape[0]} transactions, {bulk_data.nbytes} bytes\n")
+
+    feed = aggregate_transactions(iter_transaction_chunks(1_000_000, 100_000, seed=42))
+    assert feed.unique_users() == count_unique_users(bulk_data), "Feed should match a full scan"
+    print(f"Incremental top 5 products over the feed:\n{feed.top_products()}\n")
+
     total_revenue = calculate_total_revenue(transaction_data)
     print(f"Total Revenue: {total_revenue}\n")
 
@@ -261,6 +1191,13 @@ if __name__ == "__main__":
     )
     print(f"Revenue Comparison: Period 1: {revenue_period_1}, Period 2: {revenue_period_2}\n")
 
+    time_index = build_time_index(transaction_data)
+    now = datetime.datetime.now()
+    window_starts = [now - datetime.timedelta(weeks=w + 1) for w in range(6)]
+    window_ends = [now - datetime.timedelta(weeks=w) for w in range(6)]
+    weekly_revenues = time_index.revenues(window_starts, window_ends)
+    print_array(weekly_revenues, "Revenue per week (most recent first):")
+
     user_specific_transactions = user_transactions(transaction_data, 101)
     print_array(user_specific_transactions[:, 0], "Transaction ids for User 101:")
 
@@ -271,7 +1208,15 @@ if __name__ == "__main__":
     )
     print_array(last_week[:, 0], "Date Range Sliced Data for the last week:")
 
+    recent_query = query_transactions(to_structured_array(transaction_data))
+    recent_query.where("user_id", "==", 101).where("quantity", ">", 1)
+    recent_query.between(datetime.datetime.now() - datetime.timedelta(weeks=1), now)
+    print_array(recent_query.indices(), "Rows for User 101, quantity > 1, last week:")
+
     top_5_products = top_products(transaction_data)
+    cache = ResultCache()
+    assert cache.call(top_products, bulk_data) is cache.call(top_products, bulk_data)
+    print(f"Result cache stats: {cache.stats()}\n")
     print_array(top_5_products, "Top 5 Products by Revenue:")
 
     assert transaction_data.shape[1] == 6, "Data array should have 6 columns."  # noqa: PLR2004
@@ -39,35 +39,235 @@ A Python script (.py file) containing all the functions, along with the code to
 array and execute all manipulations.
 """
 
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Any
 
 import numpy as np
 import numpy.typing as npt
 
+from numpy_tasks.output import print_array
+
 
 def create_random_array() -> npt.NDArray[Any]:
     np.random.seed(42)
     return np.random.randint(1, 100, size=(6, 6))
 
 
-def transpose_array(array: npt.NDArray[Any]) -> npt.NDArray[Any]:
+TRANSPOSE_TILE = 256
+MATRIX_NDIM = 2
+
+
+def _transpose_band(
+    array: npt.NDArray[Any], out: npt.NDArray[Any], row_start: int, tile: int
+) -> None:
+    rows = slice(row_start, row_start + tile)
+    for col_start in range(0, array.shape[1], tile):
+        cols = slice(col_start, col_start + tile)
+        out[cols, rows] = array[rows, cols].T
+
+
+def _transpose_square_in_place(array: npt.NDArray[Any], tile: int) -> npt.NDArray[Any]:
+    size = array.shape[0]
+    for row_start in range(0, size, tile):
+        rows = slice(row_start, row_start + tile)
+        array[rows, rows] = array[rows, rows].T.copy()
+        for col_start in range(row_start + tile, size, tile):
+            cols = slice(col_start, col_start + tile)
+            upper = array[rows, cols].copy()
+            array[rows, cols] = array[cols, rows].T
+            array[cols, rows] = upper.T
+    return array
+
+
+def blocked_transpose(
+    array: npt.NDArray[Any],
+    tile: int = TRANSPOSE_TILE,
+    workers: int = 1,
+    in_place: bool = False,
+) -> npt.NDArray[Any]:
+    if array.ndim != MATRIX_NDIM:
+        msg = "blocked_transpose expects a 2-D array"
+        raise ValueError(msg)
+    if in_place:
+        if array.shape[0] != array.shape[1]:
+            msg = "in-place transpose requires a square matrix"
+            raise ValueError(msg)
+        return _transpose_square_in_place(array, tile)
+
+    out = np.empty(array.shape[::-1], dtype=array.dtype)
+    bands = range(0, array.shape[0], tile)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda start: _transpose_band(array, out, start, tile), bands))
+    else:
+        for start in bands:
+            _transpose_band(array, out, start, tile)
+    return out
+
+
+def transpose_array(
+    array: npt.NDArray[Any], materialize: bool = False, workers: int = 1
+) -> npt.NDArray[Any]:
+    if materialize and array.ndim == MATRIX_NDIM:
+        return blocked_transpose(array, workers=workers)
     return np.transpose(array)
 
 
-def reshape_array(array: npt.NDArray[Any], new_shape: tuple[int, int]) -> npt.NDArray[Any]:
+def reshape_array(
+    array: npt.NDArray[Any], new_shape: tuple[int, int], blocked: bool = False, workers: int = 1
+) -> npt.NDArray[Any]:
+    if (
+        blocked
+        and array.ndim == MATRIX_NDIM
+        and not array.flags.c_contiguous
+        and array.T.flags.c_contiguous
+    ):
+        array = blocked_transpose(array.T, workers=workers)
     return np.reshape(array, new_shape)
 
 
-def split_array(array: npt.NDArray[Any], num_splits: int, axis: int = 0) -> list[npt.NDArray[Any]]:
-    return np.array_split(array, num_splits, axis=axis)
+def split_array(
+    array: npt.NDArray[Any],
+    num_splits: int,
+    axis: int = 0,
+    out: list[npt.NDArray[Any]] | None = None,
+    views: bool = False,
+) -> list[npt.NDArray[Any]]:
+    parts = np.array_split(array, num_splits, axis=axis)
+    if views:
+        if out is not None:
+            msg = "split_array cannot both return views and copy into out"
+            raise ValueError(msg)
+        for i, part in enumerate(parts):
+            if part.size and not np.shares_memory(part, array):
+                msg = f"split part {i} is a copy, not a view of the input"
+                raise ValueError(msg)
+    if out is None:
+        return parts
+    if len(out) != len(parts):
+        msg = f"out has {len(out)} buffers but the split produces {len(parts)} parts"
+        raise ValueError(msg)
+    for buffer, part in zip(out, parts, strict=True):
+        np.copyto(buffer, part)
+    return out
+
+
+def combine_arrays(
+    arrays: list[npt.NDArray[Any]], axis: int = 0, out: npt.NDArray[Any] | None = None
+) -> npt.NDArray[Any]:
+    return np.concatenate(arrays, axis=axis, out=out)
+
+
+class BufferPool:
+    def __init__(self, max_buffers_per_shape: int = 4) -> None:
+        self.max_buffers_per_shape = max_buffers_per_shape
+        self.free: dict[tuple[tuple[int, ...], str], list[npt.NDArray[Any]]] = {}
+        self.hits = 0
+        self.misses = 0
 
+    def acquire(self, shape: tuple[int, ...], dtype: npt.DTypeLike) -> npt.NDArray[Any]:
+        buffers = self.free.get((tuple(shape), np.dtype(dtype).str))
+        if buffers:
+            self.hits += 1
+            return buffers.pop()
+        self.misses += 1
+        return np.empty(shape, dtype=dtype)
 
-def combine_arrays(arrays: list[npt.NDArray[Any]], axis: int = 0) -> npt.NDArray[Any]:
-    return np.concatenate(arrays, axis=axis)
+    def release(self, buffer: npt.NDArray[Any]) -> None:
+        if not buffer.flags.owndata:
+            msg = "only arrays that own their data can be returned to the pool"
+            raise ValueError(msg)
+        buffers = self.free.setdefault((buffer.shape, buffer.dtype.str), [])
+        if len(buffers) < self.max_buffers_per_shape:
+            buffers.append(buffer)
 
+    @contextmanager
+    def borrow(self, shape: tuple[int, ...], dtype: npt.DTypeLike) -> Iterator[npt.NDArray[Any]]:
+        buffer = self.acquire(shape, dtype)
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
 
-def print_array(array: npt.NDArray[Any], message: str = "Array:") -> None:
-    print(f"{message}\n{array}\n")
+
+Step = tuple[str, dict[str, Any]]
+
+
+def _copied_bytes(source: Any, result: Any) -> int:
+    sources = source if isinstance(source, list) else [source]
+    results = result if isinstance(result, list) else [result]
+    return sum(
+        part.nbytes
+        for part in results
+        if not any(np.may_share_memory(part, origin) for origin in sources)
+    )
+
+
+class ArrayPipeline:
+    def __init__(self, array: npt.NDArray[Any], steps: list[Step] | None = None) -> None:
+        self.array = array
+        self.steps: list[Step] = steps or []
+        self.stats: list[dict[str, Any]] = []
+
+    def _then(self, name: str, **params: Any) -> "ArrayPipeline":
+        return ArrayPipeline(self.array, [*self.steps, (name, params)])
+
+    def transpose(self) -> "ArrayPipeline":
+        return self._then("transpose")
+
+    def reshape(self, new_shape: tuple[int, ...]) -> "ArrayPipeline":
+        return self._then("reshape", new_shape=new_shape)
+
+    def split(self, num_splits: int, axis: int = 0) -> "ArrayPipeline":
+        return self._then("split", num_splits=num_splits, axis=axis)
+
+    def combine(self, axis: int = 0) -> "ArrayPipeline":
+        return self._then("combine", axis=axis)
+
+    def simplified_steps(self) -> list[Step]:
+        steps: list[Step] = []
+        for name, params in self.steps:
+            previous = steps[-1] if steps else None
+            if (
+                previous
+                and name == "combine"
+                and previous[0] == "split"
+                and previous[1]["axis"] == params["axis"]
+            ):
+                steps.pop()
+                continue
+            if previous and name == previous[0] == "transpose":
+                steps.pop()
+                continue
+            if previous and name == previous[0] == "reshape":
+                steps.pop()
+            steps.append((name, params))
+        return steps
+
+    def compute(self, simplify: bool = True) -> Any:
+        result: Any = self.array
+        self.stats = []
+        for name, params in self.simplified_steps() if simplify else self.steps:
+            if isinstance(result, list) != (name == "combine"):
+                msg = f"{name} cannot follow {'split' if isinstance(result, list) else 'an array'}"
+                raise ValueError(msg)
+            source = result
+            if name == "transpose":
+                result = transpose_array(source)
+            elif name == "reshape":
+                result = reshape_array(source, params["new_shape"])
+            elif name == "split":
+                result = split_array(source, params["num_splits"], params["axis"])
+            else:
+                result = combine_arrays(source, params["axis"])
+            self.stats.append({"stage": name, "copied_bytes": _copied_bytes(source, result)})
+        return result
+
+    @property
+    def copied_bytes(self) -> int:
+        return sum(stage["copied_bytes"] for stage in self.stats)
 
 
 def workflow(prints: bool = False) -> Any:
@@ -99,3 +299,8 @@ def workflow(prints: bool = False) -> Any:
 
 if __name__ == "__main__":
     workflow(prints=True)
+
+    pipeline = ArrayPipeline(create_random_array()).transpose().reshape((3, 12)).split(3).combine()
+    lazy_result = pipeline.compute()
+    print(f"Lazy pipeline {pipeline.simplified_steps()} copied {pipeline.copied_bytes} bytes\n")
+    assert lazy_result.shape == (3, 12), "Lazy pipeline should produce a 3x12 array"
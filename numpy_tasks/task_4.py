@@ -48,81 +48,1020 @@ array, save/load it in different formats, perform aggregate calculations, and ex
 manipulations.
 """
 
-from typing import Any
+import functools
+import io
+import itertools
+import json
+import lzma
+import math
+import os
+import threading
+import time
+import zipfile
+import zlib
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import IO, Any, Literal, cast
 
 import numpy as np
 import numpy.typing as npt
 
+from numpy_tasks.output import print_array
+
 
 def create_random_array() -> npt.NDArray[Any]:
     np.random.seed(42)
     return np.random.randint(1, 100, size=(10, 10))
 
 
-def save_array(array: npt.NDArray[Any], filename: str) -> None:
-    np.savetxt(f"{filename}.txt", array, fmt="%d")
-    np.savetxt(f"{filename}.csv", array, delimiter=",", fmt="%d")
-    np.save(f"{filename}.npy", array)
-    np.savez(f"{filename}.npz", array)
+SAVE_FORMATS = ("txt", "csv", "npy", "npz")
+CHUNKED_MAGIC = b"NPCHUNK1"
+CHUNKED_ROWS = 65_536
+Compression = Literal["zlib", "lzma"] | None
+_FOOTER = len(CHUNKED_MAGIC) + 8
 
 
-def load_array(filename: str, file_format: str) -> Any:
-    if file_format == "txt":
-        return np.loadtxt(f"{filename}.txt", dtype=int)
-    if file_format == "csv":
-        return np.loadtxt(f"{filename}.csv", delimiter=",", dtype=int)
-    if file_format == "npy":
-        return np.load(f"{filename}.npy")
+@contextmanager
+def atomic_write(path: Path) -> Iterator[IO[bytes]]:
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with temporary.open("wb") as file:
+            yield file
+        temporary.replace(path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+def _compress(payload: bytes, compression: Compression) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(payload)
+    if compression == "lzma":
+        return lzma.compress(payload)
+    return payload
+
+
+def _decompress(payload: bytes, compression: Compression) -> bytes:
+    if compression == "zlib":
+        return zlib.decompress(payload)
+    if compression == "lzma":
+        return lzma.decompress(payload)
+    return payload
+
+
+def _chunk_stats(chunk: npt.NDArray[Any]) -> dict[str, Any]:
+    stats: dict[str, Any] = {"count": int(chunk.size)}
+    if chunk.size and (np.issubdtype(chunk.dtype, np.number) or chunk.dtype == np.bool_):
+        stats.update(min=chunk.min().item(), max=chunk.max().item(), sum=chunk.sum().item())
+    return stats
+
+
+def save_chunked(
+    array: npt.NDArray[Any],
+    filename: str,
+    chunk_rows: int = CHUNKED_ROWS,
+    compression: Compression = "zlib",
+) -> None:
+    if array.ndim == 0:
+        msg = "save_chunked expects at least a 1-D array"
+        raise ValueError(msg)
+    array = np.ascontiguousarray(array)
+    chunks = []
+    with atomic_write(Path(f"{filename}.npc")) as file:
+        file.write(CHUNKED_MAGIC)
+        for start in range(0, array.shape[0], chunk_rows):
+            chunk = array[start : start + chunk_rows]
+            payload = _compress(chunk.tobytes(), compression)
+            chunks.append(
+                {"offset": file.tell(), "nbytes": len(payload), "rows": len(chunk)}
+                | _chunk_stats(chunk)
+            )
+            file.write(payload)
+        header = json.dumps(
+            {
+                "dtype": np.lib.format.dtype_to_descr(array.dtype),
+                "shape": array.shape,
+                "chunk_rows": chunk_rows,
+                "compression": compression,
+                "chunks": chunks,
+            }
+        ).encode()
+        file.write(header)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(CHUNKED_MAGIC)
+
+
+class ChunkedArray:
+    def __init__(self, filename: str) -> None:
+        self.path = Path(f"{filename}.npc")
+        with self.path.open("rb") as file:
+            file.seek(-_FOOTER, 2)
+            footer = file.read(_FOOTER)
+            if footer[8:] != CHUNKED_MAGIC:
+                msg = f"{self.path} is not a chunked array file"
+                raise ValueError(msg)
+            header_length = int.from_bytes(footer[:8], "little")
+            file.seek(-_FOOTER - header_length, 2)
+            header = json.loads(file.read(header_length))
+        self.dtype = np.lib.format.descr_to_dtype(header["dtype"])
+        self.shape = tuple(header["shape"])
+        self.chunk_rows: int = header["chunk_rows"]
+        self.compression: Compression = header["compression"]
+        self.chunks: list[dict[str, Any]] = header["chunks"]
+        self.chunks_read = 0
+
+    def read_chunk(self, index: int) -> npt.NDArray[Any]:
+        chunk = self.chunks[index]
+        with self.path.open("rb") as file:
+            file.seek(chunk["offset"])
+            payload = _decompress(file.read(chunk["nbytes"]), self.compression)
+        self.chunks_read += 1
+        return np.frombuffer(payload, dtype=self.dtype).reshape(chunk["rows"], *self.shape[1:])
+
+    def read_rows(self, start: int = 0, stop: int | None = None) -> npt.NDArray[Any]:
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        first, last = start // self.chunk_rows, max(start, stop - 1) // self.chunk_rows
+        if stop <= start:
+            return np.empty((0, *self.shape[1:]), dtype=self.dtype)
+        parts = [self.read_chunk(index) for index in range(first, last + 1)]
+        offset = first * self.chunk_rows
+        return np.concatenate(parts)[start - offset : stop - offset]
+
+    def read_slice(self, rows: slice) -> npt.NDArray[Any]:
+        positions = range(*rows.indices(self.shape[0]))
+        if not positions:
+            return self.read_rows(0, 0)
+        low = min(positions)
+        block = self.read_rows(low, max(positions) + 1)
+        return block[positions.start - low :: positions.step]
+
+    def load(self) -> npt.NDArray[Any]:
+        return self.read_rows()
+
+    def _stat(self, name: str) -> list[Any]:
+        if any(name not in chunk for chunk in self.chunks if chunk["count"]):
+            msg = f"{self.path} has no {name} statistics for dtype {self.dtype}"
+            raise ValueError(msg)
+        return [chunk[name] for chunk in self.chunks if chunk["count"]]
+
+    def sum(self) -> Any:
+        return np.zeros(0, dtype=self.dtype).sum().dtype.type(sum(self._stat("sum")))
+
+    def mean(self) -> float:
+        return float(sum(self._stat("sum")) / sum(chunk["count"] for chunk in self.chunks))
+
+    def min(self) -> Any:
+        return min(self._stat("min"))
+
+    def max(self) -> Any:
+        return max(self._stat("max"))
+
+    def filter_range(self, low: Any, high: Any) -> npt.NDArray[Any]:
+        matches = []
+        for index, chunk in enumerate(self.chunks):
+            if not chunk["count"] or chunk["max"] < low or chunk["min"] > high:
+                continue
+            values = self.read_chunk(index)
+            matches.append(values[(values >= low) & (values <= high)])
+        return np.concatenate(matches) if matches else np.empty(0, dtype=self.dtype)
+
+
+def _write_format(array: npt.NDArray[Any], filename: str, file_format: str) -> None:
+    if file_format == "npc":
+        save_chunked(array, filename)
+        return
+    with atomic_write(Path(f"{filename}.{file_format}")) as file:
+        if file_format == "txt":
+            np.savetxt(file, array, fmt="%d")
+        elif file_format == "csv":
+            np.savetxt(file, array, delimiter=",", fmt="%d")
+        elif file_format == "npy":
+            np.save(file, array)
+        elif file_format == "npz":
+            np.savez(file, array)
+        else:
+            msg = f"Unknown file format: {file_format}"
+            raise ValueError(msg)
+
+
+def _timed(function: Any, timings: dict[str, float] | None, key: str, *args: Any) -> Any:
+    started = time.perf_counter()
+    result = function(*args)
+    if timings is not None:
+        timings[key] = time.perf_counter() - started
+    return result
+
+
+def _run_concurrently(tasks: list[tuple[Any, ...]], workers: int) -> list[Any]:
+    if workers <= 1 or len(tasks) <= 1:
+        return [_timed(*task) for task in tasks]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda task: _timed(*task), tasks))
+
+
+def save_array(
+    array: npt.NDArray[Any],
+    filename: str,
+    formats: Sequence[str] = SAVE_FORMATS,
+    workers: int = 1,
+    timings: dict[str, float] | None = None,
+) -> None:
+    tasks = [
+        (_write_format, timings, file_format, array, filename, file_format)
+        for file_format in formats
+    ]
+    _run_concurrently(tasks, workers)
+    write_manifest(array, filename)
+
+
+def save_arrays(
+    arrays: Mapping[str, npt.NDArray[Any]],
+    formats: Sequence[str] = SAVE_FORMATS,
+    workers: int = 4,
+    timings: dict[str, float] | None = None,
+) -> None:
+    tasks = [
+        (_write_format, timings, f"{filename}.{file_format}", array, filename, file_format)
+        for filename, array in arrays.items()
+        for file_format in formats
+    ]
+    _run_concurrently(tasks, workers)
+    for filename, array in arrays.items():
+        write_manifest(array, filename)
+
+
+class IntegrityError(ValueError):
+    def __init__(self, source: str, rows: tuple[int, int], reason: str) -> None:
+        super().__init__(f"{source}: rows {rows[0]}:{rows[1]} {reason}")
+        self.source = source
+        self.rows = rows
+
+
+def _manifest_path(filename: str) -> Path:
+    return Path(f"{filename}.manifest.json")
+
+
+def _chunk_checksum(chunk: npt.NDArray[Any], dtype: np.dtype[Any]) -> int:
+    return zlib.crc32(np.ascontiguousarray(chunk, dtype=dtype))
+
+
+def write_manifest(array: npt.NDArray[Any], filename: str, chunk_rows: int = CHUNKED_ROWS) -> None:
+    array = np.asarray(array)
+    if array.ndim == 0:
+        array = array.reshape(1)
+    checksums = [
+        _chunk_checksum(array[start : start + chunk_rows], array.dtype)
+        for start in range(0, array.shape[0], chunk_rows)
+    ]
+    manifest = {
+        "dtype": np.lib.format.dtype_to_descr(array.dtype),
+        "shape": array.shape,
+        "chunk_rows": chunk_rows,
+        "algorithm": "crc32",
+        "checksums": checksums,
+    }
+    with atomic_write(_manifest_path(filename)) as file:
+        file.write(json.dumps(manifest).encode())
+
+
+def read_manifest(filename: str) -> dict[str, Any]:
+    manifest: dict[str, Any] = json.loads(_manifest_path(filename).read_text())
+    return manifest
+
+
+def _verified_chunks(
+    chunks: Iterable[npt.NDArray[Any]], manifest: Mapping[str, Any], source: str
+) -> Iterator[npt.NDArray[Any]]:
+    dtype = np.lib.format.descr_to_dtype(manifest["dtype"])
+    shape, chunk_rows, checksums = manifest["shape"], manifest["chunk_rows"], manifest["checksums"]
+    iterator = iter(chunks)
+    for index, expected in enumerate(checksums):
+        start = index * chunk_rows
+        stop = min(start + chunk_rows, shape[0])
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            raise IntegrityError(source, (start, shape[0]), "missing") from None
+        except (ValueError, zlib.error, lzma.LZMAError) as error:
+            raise IntegrityError(source, (start, stop), f"unreadable ({error})") from error
+        rows_shape = (stop - start, *shape[1:])
+        if chunk.size == math.prod(rows_shape):
+            chunk = chunk.reshape(rows_shape)
+        if chunk.shape != rows_shape or _chunk_checksum(chunk, dtype) != expected:
+            raise IntegrityError(source, (start, stop), "checksum mismatch")
+        yield chunk
+    if next(iterator, None) is not None:
+        raise IntegrityError(source, (shape[0], shape[0]), "has unexpected trailing rows")
+
+
+def _split_rows(array: npt.NDArray[Any], chunk_rows: int) -> Iterator[npt.NDArray[Any]]:
+    for start in range(0, array.shape[0], chunk_rows):
+        yield array[start : start + chunk_rows]
+
+
+def _verify_loaded(array: Any, filename: str, file_format: str) -> Any:
+    manifest = read_manifest(filename)
+    rows = np.atleast_1d(array)
+    if rows.size == math.prod(manifest["shape"]):
+        rows = rows.reshape(manifest["shape"])
+    chunks = _split_rows(rows, manifest["chunk_rows"])
+    for _ in _verified_chunks(chunks, manifest, f"{filename}.{file_format}"):
+        pass
+    return array
+
+
+def verify_array(filename: str, file_format: str) -> int:
+    manifest = read_manifest(filename)
+    chunk_rows = manifest["chunk_rows"]
+    if file_format == "npc":
+        chunked = ChunkedArray(filename)
+        chunks: Iterable[npt.NDArray[Any]] = (
+            chunked.read_rows(start, start + chunk_rows)
+            for start in range(0, chunked.shape[0], chunk_rows)
+        )
+    else:
+        chunks = iter_array_chunks(filename, file_format, chunk_rows)
+    source = f"{filename}.{file_format}"
+    return sum(len(chunk) for chunk in _verified_chunks(chunks, manifest, source))
+
+
+TEXT_BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def _text_dtype(dtype: npt.DTypeLike | Sequence[npt.DTypeLike]) -> np.dtype[Any]:
+    if isinstance(dtype, list | tuple):
+        return np.dtype([(f"f{i}", column_dtype) for i, column_dtype in enumerate(dtype)])
+    return np.dtype(cast(npt.DTypeLike, dtype))
+
+
+def _split_byte_ranges(path: Path, parts: int) -> list[tuple[int, int]]:
+    size = path.stat().st_size
+    bounds = [0]
+    with path.open("rb") as file:
+        for part in range(1, parts):
+            file.seek(max(size * part // parts - 1, bounds[-1]))
+            file.readline()
+            bounds.append(min(file.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in itertools.pairwise(bounds) if end > start]
+
+
+def _parse_text_range(
+    path: str,
+    byte_range: tuple[int, int],
+    delimiter: str | None,
+    dtype: np.dtype[Any],
+    block_size: int,
+) -> npt.NDArray[Any]:
+    start, end = byte_range
+    ndmin: Literal[1, 2] = 1 if dtype.names else 2
+    blocks = []
+    with Path(path).open("rb") as file:
+        file.seek(start)
+        remaining = end - start
+        carry = b""
+        while remaining > 0 or carry:
+            read = file.read(min(block_size, remaining)) if remaining > 0 else b""
+            remaining -= len(read)
+            block = carry + read
+            carry = b""
+            if remaining > 0:
+                cut = block.rfind(b"\n") + 1
+                block, carry = block[:cut], block[cut:]
+            if block.strip():
+                stream = io.BytesIO(block)
+                blocks.append(np.loadtxt(stream, delimiter=delimiter, dtype=dtype, ndmin=ndmin))
+    if not blocks:
+        return np.empty((0,) if dtype.names else (0, 0), dtype=dtype)
+    return np.concatenate(blocks)
+
+
+def read_text_array(
+    filename: str,
+    file_format: str,
+    dtype: npt.DTypeLike | Sequence[npt.DTypeLike] = int,
+    *,
+    workers: int = 1,
+    block_size: int = TEXT_BLOCK_SIZE,
+    stats: dict[str, float] | None = None,
+) -> npt.NDArray[Any]:
+    path = Path(f"{filename}.{file_format}")
+    delimiter = "," if file_format == "csv" else None
+    parsed_dtype = _text_dtype(dtype)
+    started = time.perf_counter()
+
+    ranges = _split_byte_ranges(path, max(workers, 1))
+    args = [(str(path), byte_range, delimiter, parsed_dtype, block_size) for byte_range in ranges]
+    if len(ranges) == 1:
+        ndmin: Literal[1, 2] = 1 if parsed_dtype.names else 2
+        parts = [np.loadtxt(path, delimiter=delimiter, dtype=parsed_dtype, ndmin=ndmin)]
+    elif workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_parse_text_range, *zip(*args, strict=True)))
+    else:
+        parts = [_parse_text_range(*arg) for arg in args]
+
+    array = np.concatenate(parts) if parts else np.empty(0, dtype=parsed_dtype)
+    rows = array.shape[0]
+    if array.ndim > 0:
+        array = np.squeeze(array)
+
+    if stats is not None:
+        elapsed = time.perf_counter() - started
+        stats["rows"] = rows
+        stats["bytes"] = path.stat().st_size
+        stats["seconds"] = elapsed
+        stats["rows_per_second"] = rows / elapsed if elapsed else float("inf")
+    return array
+
+
+MmapMode = Literal["r", "c"]
+
+
+def _read_npy_header(file: IO[bytes]) -> tuple[tuple[int, ...], bool, np.dtype[Any]]:
+    version = np.lib.format.read_magic(file)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(file)
+    return np.lib.format.read_array_header_2_0(file)
+
+
+def _memmap_npz_member(path: str, member: str, mmap_mode: MmapMode) -> npt.NDArray[Any]:
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED:
+        msg = f"{path}:{member} is compressed and cannot be memory-mapped"
+        raise ValueError(msg)
+    with Path(path).open("rb") as file:
+        file.seek(info.header_offset)
+        local_header = file.read(30)
+        name_length = int.from_bytes(local_header[26:28], "little")
+        extra_length = int.from_bytes(local_header[28:30], "little")
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+        shape, fortran_order, dtype = _read_npy_header(file)
+        offset = file.tell()
+    order: Literal["C", "F"] = "F" if fortran_order else "C"
+    return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape, order=order)
+
+
+def _load_npz(filename: str, mmap_mode: MmapMode | None) -> Any:
+    if mmap_mode is not None:
+        return _memmap_npz_member(f"{filename}.npz", "arr_0.npy", mmap_mode)
     return np.load(f"{filename}.npz")["arr_0"]
 
 
-def compute_sum(array: npt.NDArray[Any]) -> Any:
+def _text_workers(filename: str, file_format: str, block_size: int) -> int:
+    blocks = -(-Path(f"{filename}.{file_format}").stat().st_size // block_size)
+    return max(1, min(os.cpu_count() or 1, blocks))
+
+
+def load_array(
+    filename: str,
+    file_format: str,
+    mmap_mode: MmapMode | None = None,
+    rows: slice | None = None,
+    verify: bool = False,
+    *,
+    dtype: npt.DTypeLike | Sequence[npt.DTypeLike] = int,
+    text_workers: int | None = None,
+    block_size: int = TEXT_BLOCK_SIZE,
+) -> Any:
+    text_options: dict[str, Any] = {
+        "dtype": dtype,
+        "text_workers": text_workers,
+        "block_size": block_size,
+    }
+    if verify:
+        if rows is not None:
+            msg = "verify=True checks whole arrays and cannot be combined with rows="
+            raise ValueError(msg)
+        loaded = load_array(filename, file_format, mmap_mode, **text_options)
+        return _verify_loaded(loaded, filename, file_format)
+    if mmap_mode is not None and file_format not in {"npy", "npz"}:
+        msg = f"mmap_mode is only supported for npy and npz, not {file_format}"
+        raise ValueError(msg)
+    if file_format == "npc":
+        return ChunkedArray(filename).read_slice(rows or slice(None))
+    if rows is not None:
+        mmap_mode = mmap_mode or _row_mmap(file_format)
+        return load_array(filename, file_format, mmap_mode, **text_options)[rows]
+    if file_format in {"txt", "csv"}:
+        if text_workers is None:
+            text_workers = _text_workers(filename, file_format, block_size)
+        return read_text_array(
+            filename, file_format, dtype, workers=text_workers, block_size=block_size
+        )
+    if file_format == "npy":
+        return np.load(f"{filename}.npy", mmap_mode=mmap_mode)
+    return _load_npz(filename, mmap_mode)
+
+
+def load_arrays(
+    filenames: str | Sequence[str],
+    formats: Sequence[str] = SAVE_FORMATS,
+    workers: int = 4,
+    timings: dict[str, float] | None = None,
+    verify: bool = False,
+    *,
+    dtype: npt.DTypeLike | Sequence[npt.DTypeLike] = int,
+    text_workers: int | None = None,
+    block_size: int = TEXT_BLOCK_SIZE,
+) -> dict[str, Any]:
+    load = functools.partial(
+        load_array, dtype=dtype, text_workers=text_workers, block_size=block_size
+    )
+    if isinstance(filenames, str):
+        tasks = [
+            (load, timings, file_format, filenames, file_format, None, None, verify)
+            for file_format in formats
+        ]
+        return dict(zip(formats, _run_concurrently(tasks, workers), strict=True))
+    tasks = [
+        (load, timings, f"{name}.{file_format}", name, file_format, None, None, verify)
+        for name in filenames
+        for file_format in formats
+    ]
+    loaded = iter(_run_concurrently(tasks, workers))
+    return {name: {file_format: next(loaded) for file_format in formats} for name in filenames}
+
+
+def _row_mmap(file_format: str) -> MmapMode | None:
+    return "r" if file_format in {"npy", "npz"} else None
+
+
+def save_columns(array: npt.NDArray[Any], dirname: str) -> None:
+    if array.dtype.names is None:
+        msg = "save_columns expects a structured array"
+        raise ValueError(msg)
+    Path(dirname).mkdir(parents=True, exist_ok=True)
+    for name in array.dtype.names:
+        np.save(Path(dirname) / f"{name}.npy", array[name])
+
+
+def load_columns(
+    dirname: str, columns: list[str] | None = None, mmap_mode: MmapMode | None = "r"
+) -> dict[str, npt.NDArray[Any]]:
+    if columns is None:
+        columns = sorted(path.stem for path in Path(dirname).glob("*.npy"))
+    return {name: np.load(Path(dirname) / f"{name}.npy", mmap_mode=mmap_mode) for name in columns}
+
+
+def _iter_text_chunks(
+    filename: str, file_format: str, chunk_rows: int
+) -> Iterator[npt.NDArray[Any]]:
+    delimiter = "," if file_format == "csv" else None
+    with Path(f"{filename}.{file_format}").open() as file:
+        while lines := list(itertools.islice(file, chunk_rows)):
+            yield np.loadtxt(lines, delimiter=delimiter, dtype=int, ndmin=2)
+
+
+def _iter_npy_stream_chunks(file: IO[bytes], chunk_rows: int) -> Iterator[npt.NDArray[Any]]:
+    shape, fortran_order, dtype = _read_npy_header(file)
+    if fortran_order or not shape:
+        yield np.lib.format.read_array(file)
+        return
+    row_shape = shape[1:]
+    row_bytes = math.prod(row_shape) * dtype.itemsize
+    for start in range(0, shape[0], chunk_rows):
+        rows = min(chunk_rows, shape[0] - start)
+        buffer = file.read(rows * row_bytes)
+        yield np.frombuffer(buffer, dtype=dtype).reshape(rows, *row_shape)
+
+
+def iter_array_chunks(
+    filename: str, file_format: str, chunk_rows: int = 100_000
+) -> Iterator[npt.NDArray[Any]]:
+    if chunk_rows <= 0:
+        msg = "chunk_rows must be positive"
+        raise ValueError(msg)
+    if file_format in {"txt", "csv"}:
+        yield from _iter_text_chunks(filename, file_format, chunk_rows)
+    elif file_format == "npy":
+        with Path(f"{filename}.npy").open("rb") as file:
+            yield from _iter_npy_stream_chunks(file, chunk_rows)
+    else:
+        with (
+            zipfile.ZipFile(f"{filename}.npz") as archive,
+            archive.open("arr_0.npy") as member,
+        ):
+            yield from _iter_npy_stream_chunks(member, chunk_rows)
+
+
+AGGREGATE_CHUNK_ROWS = 4096
+
+
+class RunningAggregate:
+    def __init__(
+        self,
+        *,
+        count: int,
+        total: Any,
+        mean: Any,
+        m2: Any,
+        minimum: Any,
+        maximum: Any,
+    ) -> None:
+        self.count = count
+        self.total = total
+        self.mean = mean
+        self.m2 = m2
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @classmethod
+    def from_array(cls, array: npt.NDArray[Any], axis: int | None = None) -> "RunningAggregate":
+        count = array.size if axis is None else array.shape[axis]
+        total = np.sum(array, axis=axis)
+        if count == 0:
+            zeros = np.zeros(np.shape(total))[()]
+            return cls(
+                count=0,
+                total=total,
+                mean=zeros,
+                m2=zeros,
+                minimum=zeros + np.inf,
+                maximum=zeros - np.inf,
+            )
+        mean = np.divide(total, count, dtype=np.float64)
+        if axis is None:
+            centered = array - mean
+            m2 = np.vdot(centered, centered)
+        else:
+            centered = array - np.expand_dims(mean, axis)
+            m2 = np.sum(centered * centered, axis=axis)
+        return cls(
+            count=count,
+            total=total,
+            mean=mean,
+            m2=m2,
+            minimum=np.min(array, axis=axis),
+            maximum=np.max(array, axis=axis),
+        )
+
+    def merge(self, other: "RunningAggregate") -> "RunningAggregate":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return RunningAggregate(
+            count=count,
+            total=self.total + other.total,
+            mean=self.mean + delta * (other.count / count),
+            m2=self.m2 + other.m2 + delta * delta * (self.count * other.count / count),
+            minimum=np.minimum(self.minimum, other.minimum),
+            maximum=np.maximum(self.maximum, other.maximum),
+        )
+
+    def update(self, array: npt.NDArray[Any], axis: int | None = None) -> "RunningAggregate":
+        return self.merge(RunningAggregate.from_array(array, axis))
+
+    @property
+    def variance(self) -> Any:
+        return self.m2 / self.count
+
+    @property
+    def std(self) -> Any:
+        return np.sqrt(self.variance)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "std": self.std,
+            "min": self.minimum,
+            "max": self.maximum,
+        }
+
+
+def _concatenate_aggregates(parts: list[RunningAggregate]) -> RunningAggregate:
+    return RunningAggregate(
+        count=parts[0].count,
+        total=np.concatenate([part.total for part in parts]),
+        mean=np.concatenate([part.mean for part in parts]),
+        m2=np.concatenate([part.m2 for part in parts]),
+        minimum=np.concatenate([part.minimum for part in parts]),
+        maximum=np.concatenate([part.maximum for part in parts]),
+    )
+
+
+def compute_aggregates(
+    array: npt.NDArray[Any], axis: int | None = None, chunk_rows: int = AGGREGATE_CHUNK_ROWS
+) -> RunningAggregate:
+    if array.ndim == 0 or array.shape[0] == 0:
+        return RunningAggregate.from_array(array, axis)
+    if axis is not None:
+        axis = axis % array.ndim
+    blocks = (array[start : start + chunk_rows] for start in range(0, array.shape[0], chunk_rows))
+    if axis is None or axis == 0:
+        aggregate = RunningAggregate.from_array(next(blocks), axis)
+        for block in blocks:
+            aggregate = aggregate.update(block, axis)
+        return aggregate
+    return _concatenate_aggregates([RunningAggregate.from_array(block, axis) for block in blocks])
+
+
+def compute_sum(array: npt.NDArray[Any] | ChunkedArray) -> Any:
+    if isinstance(array, ChunkedArray):
+        return array.sum()
     return np.sum(array)
 
 
-def compute_mean(array: npt.NDArray[Any]) -> Any:
+def compute_mean(array: npt.NDArray[Any] | ChunkedArray) -> Any:
+    if isinstance(array, ChunkedArray):
+        return array.mean()
     return np.mean(array)
 
 
-def compute_median(array: npt.NDArray[Any]) -> Any:
-    return np.median(array)
+def compute_median(array: npt.NDArray[Any], overwrite_input: bool = False) -> Any:
+    return np.median(array, overwrite_input=overwrite_input)
+
+
+def compute_quantile(array: npt.NDArray[Any], q: Any, overwrite_input: bool = False) -> Any:
+    return np.quantile(array, q, overwrite_input=overwrite_input)
 
 
 def compute_std(array: npt.NDArray[Any]) -> Any:
     return np.std(array)
 
 
-def compute_sum_along_axis(array: npt.NDArray[Any], axis: int) -> Any:
-    return np.sum(array, axis=axis)
+AXIS_REDUCERS: dict[str, Any] = {
+    "sum": np.sum,
+    "mean": np.mean,
+    "median": np.median,
+    "std": np.std,
+}
+ParallelBackend = Literal["thread", "process"]
+
+
+def _block_bounds(length: int, blocks: int) -> list[tuple[int, int]]:
+    edges = np.linspace(0, length, min(blocks, length) + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in itertools.pairwise(edges)]
+
+
+def _block(array: npt.NDArray[Any], split_axis: int, start: int, stop: int) -> npt.NDArray[Any]:
+    index: list[slice] = [slice(None)] * array.ndim
+    index[split_axis] = slice(start, stop)
+    return array[tuple(index)]
+
+
+SharedSource = tuple[Literal["shm", "file"], str, int]
+
+
+def _root_array(array: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def _address(array: npt.NDArray[Any]) -> int:
+    return int(array.__array_interface__["data"][0])
+
+
+def _shared_source(
+    array: npt.NDArray[Any], shared: shared_memory.SharedMemory | None
+) -> SharedSource | None:
+    if shared is not None:
+        return "shm", shared.name, _address(array) - _address(np.ndarray(0, np.uint8, shared.buf))
+    root = _root_array(array)
+    if isinstance(root, np.memmap) and root.filename is not None:
+        return "file", str(root.filename), root.offset + _address(array) - _address(root)
+    return None
+
+
+def _reduce_shared_block(
+    spec: tuple[
+        SharedSource,
+        tuple[int, ...],
+        tuple[int, ...],
+        str,
+        str,
+        int,
+        int,
+        tuple[int, int],
+        dict[str, Any],
+    ],
+) -> npt.NDArray[Any]:
+    (kind, name, offset), shape, strides, dtype, reducer, axis, split_axis, bound, options = spec
+    shared = shared_memory.SharedMemory(name=name) if kind == "shm" else None
+    try:
+        buffer = shared.buf if shared is not None else np.memmap(name, np.uint8, mode="c")
+        array: npt.NDArray[Any] = np.ndarray(
+            shape, dtype=dtype, buffer=buffer, offset=offset, strides=strides
+        )
+        block = _block(array, split_axis, *bound)
+        result = np.asarray(AXIS_REDUCERS[reducer](block, axis, **options))
+        del block, array, buffer
+        return result
+    finally:
+        if shared is not None:
+            shared.close()
+
 
+def parallel_reduce_along_axis(
+    array: npt.NDArray[Any],
+    reducer: str,
+    axis: int,
+    workers: int | None = None,
+    backend: ParallelBackend = "thread",
+    *,
+    options: Mapping[str, Any] | None = None,
+    shared: shared_memory.SharedMemory | None = None,
+) -> Any:
+    workers = workers or os.cpu_count() or 1
+    options = dict(options or {})
+    axis = axis % array.ndim
+    split_axis = 0 if axis != 0 else 1
+    bounds = _block_bounds(array.shape[split_axis], workers) if array.ndim > 1 else []
+    if not bounds or workers <= 1:
+        return AXIS_REDUCERS[reducer](array, axis=axis, **options)
+    result_axis = split_axis if split_axis < axis else split_axis - 1
 
-def compute_mean_along_axis(array: npt.NDArray[Any], axis: int) -> Any:
-    return np.mean(array, axis=axis)
+    if backend == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parts = list(
+                executor.map(
+                    lambda bound: AXIS_REDUCERS[reducer](
+                        _block(array, split_axis, *bound), axis, **options
+                    ),
+                    bounds,
+                )
+            )
+        return np.concatenate(parts, axis=result_axis)
 
+    source = _shared_source(array, shared)
+    staging = None
+    if source is None:
+        # Plain in-memory input costs one full copy into a new segment per call; pass a
+        # memmap or an array living in `shared` to hand workers only a name or path.
+        staging = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        staged: npt.NDArray[Any] = np.ndarray(array.shape, dtype=array.dtype, buffer=staging.buf)
+        staged[...] = array
+        source = ("shm", staging.name, 0)
+        strides = staged.strides
+        del staged
+    else:
+        strides = array.strides
+    try:
+        specs = [
+            (
+                source,
+                array.shape,
+                strides,
+                array.dtype.str,
+                reducer,
+                axis,
+                split_axis,
+                bound,
+                options,
+            )
+            for bound in bounds
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_reduce_shared_block, specs))
+    finally:
+        if staging is not None:
+            staging.close()
+            staging.unlink()
+    return np.concatenate(parts, axis=result_axis)
 
-def compute_median_along_axis(array: npt.NDArray[Any], axis: int) -> Any:
-    return np.median(array, axis=axis)
 
+def compute_sum_along_axis(array: npt.NDArray[Any], axis: int, workers: int = 1) -> Any:
+    return parallel_reduce_along_axis(array, "sum", axis, workers)
 
-def compute_std_along_axis(array: npt.NDArray[Any], axis: int) -> Any:
-    return np.std(array, axis=axis)
 
+def compute_mean_along_axis(array: npt.NDArray[Any], axis: int, workers: int = 1) -> Any:
+    return parallel_reduce_along_axis(array, "mean", axis, workers)
 
-def print_array(array: Any, message: str = "Array:") -> None:
-    print(f"{message}\n{array}\n")
+
+def compute_median_along_axis(
+    array: npt.NDArray[Any], axis: int, overwrite_input: bool = False, workers: int = 1
+) -> Any:
+    if workers <= 1:
+        return np.median(array, axis=axis, overwrite_input=overwrite_input)
+    options = {"overwrite_input": overwrite_input}
+    return parallel_reduce_along_axis(array, "median", axis, workers, options=options)
+
+
+def compute_std_along_axis(array: npt.NDArray[Any], axis: int, workers: int = 1) -> Any:
+    return parallel_reduce_along_axis(array, "std", axis, workers)
+
+
+QUANTILE_SKETCH_K = 200
+_SKETCH_CAPACITY_DECAY = 2 / 3
+
+
+class QuantileSketch:
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: int | None = None) -> None:
+        if k < 2:  # noqa: PLR2004
+            msg = "k must be at least 2"
+            raise ValueError(msg)
+        self.k = k
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.levels: list[npt.NDArray[np.float64]] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(self.k * _SKETCH_CAPACITY_DECAY**depth))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                items = np.sort(items)
+                keep = items[items.size - items.size % 2 :]
+                promoted = items[self._rng.integers(2) : items.size - keep.size : 2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def update(self, array: npt.NDArray[Any]) -> "QuantileSketch":
+        values = np.asarray(array, dtype=np.float64).reshape(-1)
+        if values.size:
+            self.count += values.size
+            self.minimum = min(self.minimum, float(values.min()))
+            self.maximum = max(self.maximum, float(values.max()))
+            self.levels[0] = np.concatenate((self.levels[0], values))
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress()
+        return self
+
+    def quantile(self, q: Any) -> Any:
+        if self.count == 0:
+            msg = "quantile of an empty sketch"
+            raise ValueError(msg)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(items.size, 2**level, dtype=np.int64)
+                for level, items in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        ranks = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side="left"), values.size - 1)
+        result = np.clip(values[positions], self.minimum, self.maximum)
+        result = np.where(np.asarray(q) <= 0, self.minimum, result)
+        result = np.where(np.asarray(q) >= 1, self.maximum, result)
+        return result[()] if np.ndim(q) == 0 else result
+
+    def median(self) -> Any:
+        return self.quantile(0.5)
+
+
+def approximate_quantile(
+    data: npt.NDArray[Any] | Iterable[npt.NDArray[Any]],
+    q: Any,
+    k: int = QUANTILE_SKETCH_K,
+    seed: int | None = None,
+) -> Any:
+    sketch = QuantileSketch(k, seed)
+    chunks = [data] if isinstance(data, np.ndarray) else data
+    for chunk in chunks:
+        sketch.update(chunk)
+    return sketch.quantile(q)
 
 
 def workflow() -> Any:
     initial_array = create_random_array()
     print_array(initial_array, "Initial 10x10 Array:")
-    save_array(initial_array, "test_array")
+    save_timings: dict[str, float] = {}
+    save_array(initial_array, "test_array", (*SAVE_FORMATS, "npc"), workers=5, timings=save_timings)
 
     print("Array saved in .txt, .csv, .npy, and .npz formats.\n")
+    print(f"Save time per format: {save_timings}\n")
 
-    loaded_txt_array = load_array("test_array", "txt")
-    loaded_csv_array = load_array("test_array", "csv")
-    loaded_npy_array = load_array("test_array", "npy")
-    loaded_npz_array = load_array("test_array", "npz")
+    load_timings: dict[str, float] = {}
+    loaded = load_arrays("test_array", workers=4, timings=load_timings, verify=True)
+    print(f"Load time per format: {load_timings}\n")
+    loaded_txt_array = loaded["txt"]
+    loaded_csv_array = loaded["csv"]
+    loaded_npy_array = loaded["npy"]
+    loaded_npz_array = loaded["npz"]
+    mapped_npy_array = load_array("test_array", "npy", mmap_mode="r")
+    assert compute_sum(mapped_npy_array) == compute_sum(initial_array)
+    assert compute_sum(ChunkedArray("test_array")) == compute_sum(initial_array)
 
     print_array(loaded_txt_array, "Loaded Array from .txt:")
     print_array(loaded_csv_array, "Loaded Array from .csv:")
@@ -141,6 +1080,10 @@ def workflow() -> Any:
     std_deviation = compute_std(initial_array)
     print(f"Standard Deviation of elements: {std_deviation}\n")
 
+    aggregates = compute_aggregates(initial_array)
+    print(f"Single-pass aggregates: {aggregates.as_dict()}\n")
+    assert aggregates.total == total_sum and np.isclose(aggregates.std, std_deviation)
+
     sum_along_rows = compute_sum_along_axis(initial_array, axis=1)
     print_array(sum_along_rows, "Sum along rows:")
 
@@ -169,19 +1112,8 @@ def workflow() -> Any:
 
 
 if __name__ == "__main__":
-    initial_array, loaded_txt_array, loaded_csv_array, loaded_npy_array, loaded_npz_array = (
-        workflow()
-    )
+    initial_array, *_ = workflow()
 
-    assert np.array_equal(
-        initial_array, loaded_txt_array
-    ), "Loaded .txt array does not match the original."
-    assert np.array_equal(
-        initial_array, loaded_csv_array
-    ), "Loaded .csv array does not match the original."
-    assert np.array_equal(
-        initial_array, loaded_npy_array
-    ), "Loaded .npy array does not match the original."
-    assert np.array_equal(
-        initial_array, loaded_npz_array
-    ), "Loaded .npz array does not match the original."
+    for file_format in (*SAVE_FORMATS, "npc"):
+        verified_rows = verify_array("test_array", file_format)
+        assert verified_rows == initial_array.shape[0], f"Saved .{file_format} array is incomplete."
@@ -0,0 +1,33 @@
+from benchmarks.run import TEXT_FORMAT_SIZE_LIMIT, compare_to_baseline, main, run_benchmarks
+
+
+def test_run_benchmarks_records_every_size():
+    results = run_benchmarks(sizes=(100, 400), repeat=1, pattern="task_4.compute_sum")
+
+    assert [entry["size"] for entry in results] == [100, 400]
+    assert all(entry["seconds"] > 0 and entry["throughput"] > 0 for entry in results)
+
+
+def test_binary_saves_are_measured_above_the_text_size_limit():
+    sizes = (100, 2 * TEXT_FORMAT_SIZE_LIMIT)
+    results = run_benchmarks(sizes=sizes, repeat=1, pattern="task_4.save_array")
+
+    large = {entry["case"] for entry in results if entry["size"] > TEXT_FORMAT_SIZE_LIMIT}
+    assert large == {"task_4.save_array[npy]", "task_4.save_array[npz]"}, "Only text is skipped"
+    assert len(results) == len(large) + 4, "Every format should run at small sizes"
+
+
+def test_compare_to_baseline_flags_slow_cases():
+    baseline = [{"case": "a", "size": 10, "seconds": 0.01, "peak_bytes": 1_000_000}]
+    slow = [{"case": "a", "size": 10, "seconds": 0.05, "peak_bytes": 1_000_000}]
+
+    assert compare_to_baseline(baseline, baseline, tolerance=1.5) == []
+    assert len(compare_to_baseline(slow, baseline, tolerance=1.5)) == 1
+
+
+def test_missing_baseline_warns(tmp_path, capsys):
+    argv = ["--sizes", "100", "--repeat", "1", "--filter", "task_4.load_array[npy]"]
+    argv += ["--output", str(tmp_path / "out.json"), "--baseline", str(tmp_path / "none.json")]
+
+    assert main(argv) == 0
+    assert "no baseline" in capsys.readouterr().err, "A missing baseline should not pass silently"
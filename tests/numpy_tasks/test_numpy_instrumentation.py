@@ -0,0 +1,56 @@
+import json
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from numpy_tasks import task_3
+from numpy_tasks.instrumentation import instrument
+
+
+def test_instrument_records_calls_memory_and_views(tmp_path):
+    original = task_3.transpose_array
+
+    with instrument((task_3,)) as recorder:
+        task_3.workflow()
+        assert task_3.transpose_array is not original, "Functions should be wrapped"
+
+    assert task_3.transpose_array is original, "Functions should be restored on exit"
+    stats = recorder.stats
+    assert stats["task_3.workflow"]["calls"] == 1
+    assert stats["task_3.transpose_array"]["views"] == 1, "Transpose should return a view"
+    assert stats["task_3.combine_arrays"]["copies"] == 1, "Concatenate should copy"
+    assert stats["task_3.split_array"]["views"] == len(task_3.workflow()[3])
+    workflow_bytes = stats["task_3.workflow"]["allocated_bytes"]
+    combine_bytes = stats["task_3.combine_arrays"]["allocated_bytes"]
+    assert workflow_bytes >= combine_bytes > 0, "Outer calls should include nested allocations"
+    assert "task_3.workflow" in recorder.report()
+
+    recorder.to_json(tmp_path / "stats.json")
+    assert json.loads((tmp_path / "stats.json").read_text()) == stats
+
+
+def test_concurrent_calls_are_not_charged_each_others_allocations():
+    module = types.ModuleType("concurrent_module")
+    barrier = threading.Barrier(2)
+
+    def allocate(size):
+        barrier.wait()
+        return np.ones(size)
+
+    allocate.__module__ = module.__name__
+    module.allocate = allocate
+
+    concurrent_sizes = (10, 100_000)
+    solo_size = 1_000
+    with instrument((module,)) as recorder:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(module.allocate, concurrent_sizes))
+        barrier = threading.Barrier(1)
+        module.allocate(solo_size)
+
+    record = recorder.stats["concurrent_module.allocate"]
+    assert record["overlapped"] == len(concurrent_sizes), "Overlapping calls are flagged"
+    solo_bytes = np.ones(solo_size).nbytes
+    assert solo_bytes <= record["allocated_bytes"] < 2 * solo_bytes, "Only the solo call counts"
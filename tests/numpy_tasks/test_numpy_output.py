@@ -0,0 +1,55 @@
+import io
+
+import numpy as np
+import pytest
+
+from numpy_tasks import task_3
+from numpy_tasks.output import (
+    SUMMARY_THRESHOLD,
+    get_output_mode,
+    output_mode,
+    print_array,
+    set_output_mode,
+    write_array,
+)
+
+
+def test_print_array_summarizes_large_arrays():
+    array = np.arange(SUMMARY_THRESHOLD * 10).reshape(-1, 10)
+    buffer = io.StringIO()
+
+    print_array(array, "Large:", file=buffer)
+
+    text = buffer.getvalue()
+    assert text.startswith("Large:\n"), "Message should come first"
+    assert f"shape={array.shape}" in text and "rows omitted" in text
+    assert f"max={array.max()}" in text, "Summary should include basic stats"
+    assert "5000" not in text, "Middle rows should not be formatted"
+
+
+def test_print_array_prints_small_arrays_in_full():
+    buffer = io.StringIO()
+    print_array(np.arange(4), file=buffer)
+    assert buffer.getvalue() == "Array:\n[0 1 2 3]\n\n"
+
+
+def test_write_array_streams_rows_in_blocks():
+    array = np.arange(30).reshape(5, 3, 2)
+    buffer = io.StringIO()
+
+    rows = write_array(array, buffer, block_rows=4)
+
+    lines = buffer.getvalue().splitlines()
+    assert rows == len(lines) == array.size // 2, "Leading axes should be flattened into rows"
+    assert lines[0] == "0 1" and lines[-1] == "28 29"
+
+
+def test_quiet_mode_skips_output(capsys):
+    with output_mode("quiet"):
+        task_3.workflow(prints=True)
+        print_array(np.arange(3), mode="stream")
+    assert capsys.readouterr().out == "Array:\n0\n1\n2\n\n", "Explicit modes should still print"
+    assert get_output_mode() == "auto", "Mode should be restored on exit"
+
+    with pytest.raises(ValueError, match="Unknown output mode"):
+        set_output_mode("verbose")
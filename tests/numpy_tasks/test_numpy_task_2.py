@@ -0,0 +1,329 @@
+import datetime
+import functools
+import itertools
+
+import numpy as np
+import pytest
+
+from numpy_tasks.task_2 import (
+    TRANSACTION_CENTS_DTYPE,
+    TRANSACTION_DTYPE,
+    HyperLogLog,
+    ResultCache,
+    TransactionAggregates,
+    adjust_prices,
+    aggregate_transactions,
+    build_time_index,
+    calculate_total_revenue,
+    check_data_types,
+    compare_revenue,
+    convert_price_to_int,
+    count_distinct,
+    count_unique_users,
+    date_range_slicing,
+    filter_transactions,
+    generate_transactions_array,
+    generate_transactions_bulk,
+    group_by,
+    increase_prices,
+    iter_transaction_chunks,
+    most_purchased_product,
+    partition_by_key,
+    product_quantity_array,
+    query_transactions,
+    sharded_analysis,
+    to_cents_array,
+    to_structured_array,
+    top_products,
+    user_transaction_count,
+    user_transactions,
+)
+from numpy_tasks.task_4 import iter_array_chunks
+
+HLL_TOLERANCE = 0.03
+
+
+def test_structured_array_matches_object_layout():
+    data = generate_transactions_array(50)
+    structured = to_structured_array(data)
+    start = datetime.datetime.now() - datetime.timedelta(weeks=3)
+    end = datetime.datetime.now()
+
+    assert structured.dtype == TRANSACTION_DTYPE, "Structured array should use TRANSACTION_DTYPE"
+    assert structured.shape == (50,), "Structured array should have one record per row"
+    assert np.isclose(calculate_total_revenue(structured), calculate_total_revenue(data))
+    assert count_unique_users(structured) == count_unique_users(data)
+    assert np.array_equal(user_transaction_count(structured), user_transaction_count(data))
+    assert len(filter_transactions(structured)) == len(filter_transactions(data))
+    assert np.allclose(top_products(structured), top_products(data).astype(float))
+    assert len(date_range_slicing(structured, start, end)) <= len(structured)
+    assert compare_revenue(structured, start, end) <= calculate_total_revenue(structured)
+
+
+def test_increase_prices_structured_in_place():
+    structured = to_structured_array(generate_transactions_array(10))
+    prices = structured["price"].copy()
+
+    result = increase_prices(structured, 5)
+
+    assert result is structured, "Prices should be updated in place"
+    assert np.allclose(structured["price"], prices * 1.05)
+
+
+def test_bulk_generation_is_reproducible_and_matches_stream():
+    end_date = datetime.date(2024, 8, 1)
+    bulk = generate_transactions_bulk(2_500, chunk_size=1_000, seed=7, end_date=end_date)
+    chunks = list(iter_transaction_chunks(2_500, chunk_size=1_000, seed=7, end_date=end_date))
+
+    assert [len(chunk) for chunk in chunks] == [1_000, 1_000, 500]
+    assert np.array_equal(np.concatenate(chunks), bulk), "Stream should match bulk output"
+    assert np.array_equal(bulk["transaction_id"], np.arange(1, 2_501))
+    assert set(np.unique(bulk["user_id"])) <= set(range(100, 106))
+    assert set(np.unique(bulk["product_id"])) <= set(range(40, 66))
+    assert set(np.unique(bulk["quantity"])) <= set(range(1, 11))
+    assert set(np.unique(bulk["price"])) <= set(range(1, 1001))
+    assert bulk["timestamp"].min() >= np.datetime64(end_date - datetime.timedelta(weeks=6))
+    assert bulk["timestamp"].max() <= np.datetime64(end_date)
+
+
+def test_group_by_matches_per_key_reductions():
+    keys = np.array([5, 3, 5, 9, 3, 5])
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+
+    groups = group_by(keys, {"value": values})
+
+    assert np.array_equal(groups["key"], [3, 5, 9])
+    assert np.array_equal(groups["count"], [2, 3, 1])
+    assert np.allclose(groups["value_sum"], [7.0, 10.0, 4.0])
+    assert np.allclose(groups["value_mean"], [3.5, 10.0 / 3, 4.0])
+    assert np.allclose(groups["value_max"], [5.0, 6.0, 4.0])
+
+
+def test_top_products_matches_full_sort():
+    data = generate_transactions_bulk(5_000, seed=3)
+    revenues = data["quantity"] * data["price"]
+    products = np.unique(data["product_id"])
+    expected = np.array([revenues[data["product_id"] == p].sum() for p in products])
+
+    top = top_products(data)
+
+    assert np.allclose(top[:, 1], np.sort(expected)[-5:]), "Top revenues should be ascending"
+    assert np.array_equal(top[:, 0], products[np.argsort(expected)[-5:]])
+    assert top_products(data, k=0).shape == (0, 2), "k=0 should select nothing"
+    with pytest.raises(ValueError, match="non-negative"):
+        top_products(data, k=-1)
+
+
+def test_time_index_matches_mask_based_queries():
+    data = generate_transactions_bulk(2_000, seed=11, end_date=datetime.date(2024, 8, 1))
+    index = build_time_index(data)
+    starts = [datetime.datetime(2024, 7, day) for day in (1, 5, 20)]
+    ends = [datetime.datetime(2024, 7, day, 12, 30) for day in (3, 19, 31)]
+
+    revenues = index.revenues(starts, ends)
+
+    for start, end, revenue in zip(starts, ends, revenues, strict=True):
+        expected = date_range_slicing(data, start, end)
+        sliced = date_range_slicing(data, start, end, index=index)
+        assert np.array_equal(np.sort(sliced, order="transaction_id"), expected)
+        assert np.shares_memory(sliced, index.data), "Indexed slices should be views"
+        assert np.isclose(revenue, compare_revenue(data, start, end))
+        assert np.isclose(compare_revenue(data, start, end, index=index), revenue)
+
+    increase_prices(data, 50)
+    with pytest.raises(ValueError, match="stale"):
+        compare_revenue(data, starts[0], ends[0], index=index)
+    with pytest.raises(ValueError, match="stale"):
+        date_range_slicing(data[::2], starts[0], ends[0], index=index)
+    with pytest.raises(ValueError, match="stale"):
+        query_transactions(data, index).between(starts[0], ends[0]).indices()
+    refreshed = build_time_index(data)
+    assert np.isclose(
+        compare_revenue(data, starts[0], ends[0], index=refreshed),
+        compare_revenue(data, starts[0], ends[0]),
+    ), "A rebuilt index should see the new prices"
+
+
+def test_chunked_sources_match_in_memory_results(tmp_path):
+    data = generate_transactions_bulk(3_000, seed=5)
+    start = datetime.datetime.now() - datetime.timedelta(weeks=2)
+    end = datetime.datetime.now()
+    np.save(tmp_path / "transactions.npy", data)
+
+    def chunks():
+        return iter_array_chunks(str(tmp_path / "transactions"), "npy", chunk_rows=700)
+
+    assert np.isclose(calculate_total_revenue(chunks()), calculate_total_revenue(data))
+    assert count_unique_users(chunks()) == count_unique_users(data)
+    assert np.array_equal(user_transaction_count(chunks()), user_transaction_count(data))
+    assert np.allclose(top_products(chunks()), top_products(data))
+    assert np.isclose(compare_revenue(chunks(), start, end), compare_revenue(data, start, end))
+
+
+def test_cents_array_keeps_analyses_exact():
+    data = generate_transactions_bulk(1_000, seed=9)
+    cents = to_cents_array(data)
+
+    assert cents.dtype == TRANSACTION_CENTS_DTYPE
+    assert calculate_total_revenue(cents) == calculate_total_revenue(data)
+    assert np.allclose(top_products(cents), top_products(data))
+    assert np.array_equal(to_structured_array(cents), data)
+
+
+def test_adjust_prices_fuses_steps_with_exact_rounding():
+    cents = to_cents_array(generate_transactions_bulk(6, seed=1))
+    cents["price_cents"] = [10, 15, 25, 35, 1_000, 999]
+    cents["product_id"] = [40, 40, 41, 41, 42, 42]
+
+    result = adjust_prices(cents.copy(), 5)
+    assert np.array_equal(result["price_cents"], [10, 16, 26, 37, 1_050, 1_049])
+    for scalar in (np.int64(5), np.float64(5.0), np.array(5)):
+        assert np.array_equal(adjust_prices(cents.copy(), scalar), result), f"{scalar!r}"
+
+    half_up = adjust_prices(cents.copy(), [10, -10], rounding="half_up")
+    assert np.array_equal(half_up["price_cents"], [10, 15, 25, 35, 990, 989])
+    floor = adjust_prices(cents.copy(), [10, -10], rounding="floor")
+    assert np.array_equal(floor["price_cents"], [9, 14, 24, 34, 990, 989])
+
+    per_product = adjust_prices(cents.copy(), {40: 100, 42: [50, 50]}, by="product_id")
+    assert np.array_equal(per_product["price_cents"], [20, 30, 25, 35, 2_250, 2_248])
+    assert increase_prices(cents, 5) is cents, "Cents prices should be updated in place"
+
+
+def test_count_unique_users_methods_agree():
+    data = generate_transactions_bulk(20_000, seed=4)
+    data["user_id"] = np.random.default_rng(4).integers(0, 50_000, size=20_000) * 7_919
+
+    exact = len(np.unique(data["user_id"]))
+    for method in ("auto", "bitmap", "hash", "sort"):
+        assert count_unique_users(data, method=method) == exact, f"{method} should be exact"
+        chunks = iter(np.array_split(data, 7))
+        assert count_unique_users(chunks, method=method) == exact, f"streamed {method} differs"
+
+    estimate = count_unique_users(iter(np.array_split(data, 5)), method="hll")
+    assert abs(estimate - exact) / exact < HLL_TOLERANCE, "HLL should be within ~3 std errors"
+
+    left = HyperLogLog().update(data["user_id"][:10_000])
+    right = HyperLogLog().update(data["user_id"][10_000:])
+    assert left.merge(right).count() == estimate, "Merged sketches should match streaming"
+    assert count_distinct(data["product_id"]) == len(np.unique(data["product_id"]))
+
+
+def test_incremental_aggregates_match_full_scan(tmp_path):
+    data = generate_transactions_bulk(30_000, seed=5)
+    aggregates = aggregate_transactions(iter(np.array_split(data[:20_000], 4)))
+    aggregates.snapshot(tmp_path / "aggregates.npz")
+
+    restored = TransactionAggregates.restore(tmp_path / "aggregates.npz")
+    restored.ingest(data[20_000:]).ingest(data[:0])
+
+    assert restored.transactions == data.shape[0], "Restored state should keep ingesting"
+    assert np.isclose(restored.total_revenue(), calculate_total_revenue(data))
+    assert restored.unique_users() == count_unique_users(data)
+    assert np.array_equal(restored.user_transaction_count(), user_transaction_count(data))
+    assert restored.most_purchased_product() == most_purchased_product(data)
+    assert np.allclose(restored.top_products(), top_products(data))
+
+
+def test_failed_snapshot_leaves_previous_state(tmp_path, monkeypatch):
+    path = tmp_path / "aggregates.npz"
+    data = generate_transactions_bulk(1_000, seed=5)
+    aggregates = aggregate_transactions(data)
+    aggregates.snapshot(path)
+    cents = to_cents_array(generate_transactions_bulk(1_000, seed=6))
+    expected = calculate_total_revenue(data) + calculate_total_revenue(cents)
+    assert np.isclose(aggregates.ingest(cents).total_revenue(), expected)
+
+    def disk_full(file, **_):
+        file.write(b"partial")
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(np, "savez", disk_full)
+    with pytest.raises(OSError, match="No space"):
+        aggregates.snapshot(path)
+
+    assert list(tmp_path.iterdir()) == [path], "No partial file should remain"
+    assert TransactionAggregates.restore(path).transactions == len(data), "Old snapshot is kept"
+
+
+def test_result_cache_hits_invalidates_and_evicts():
+    data = generate_transactions_bulk(5_000, seed=6)
+    cache = ResultCache()
+
+    first = cache.call(top_products, data, k=5)
+    assert cache.call(top_products, data, k=5) is first, "Repeated calls should hit"
+    assert not first.flags.writeable, "Cached results should be read-only"
+
+    convert_price_to_int(data[:10])
+    refreshed = cache.call(top_products, data, k=5)
+    assert np.array_equal(refreshed, top_products(data)), "Mutating a view should invalidate"
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "entries": 1, "bytes": 80}
+
+    quantities = cache.call(lambda rows, user: user_transactions(rows, user)["quantity"], data, 101)
+    prices = cache.call(lambda rows, user: user_transactions(rows, user)["price"], data, 101)
+    assert quantities.dtype != prices.dtype, "Distinct lambdas must not share entries"
+    top_2 = cache.call(functools.partial(top_products, k=2), data)
+    top_7 = cache.call(functools.partial(top_products, k=7), data)
+    assert top_2.shape == (2, 2) and top_7.shape == (7, 2), "Distinct partials must not collide"
+
+    projected = data[["product_id", "quantity"]]
+    assert len(cache.call(check_data_types, data)) == len(TRANSACTION_DTYPE.names)
+    assert cache.call(check_data_types, projected) == check_data_types(projected)
+    assert cache.call(to_structured_array, data).base is data, "Results should be read-only views"
+    assert data.flags.writeable, "Caching must not freeze the caller's dataset"
+
+    small = ResultCache(max_bytes=2 * data.itemsize * 1_000)
+    for user_id in (100, 101, 102):
+        small.call(user_transactions, data, user_id)
+    assert small.stats()["evictions"] > 0, "Byte budget should evict the oldest results"
+    assert small.nbytes <= small.max_bytes
+
+
+def test_query_fuses_predicates_with_indices_views_and_projection():
+    data = generate_transactions_bulk(200_000, seed=7)
+    end = data["timestamp"].max().astype(datetime.datetime)
+    start = end - datetime.timedelta(weeks=1)
+
+    chained = filter_transactions(date_range_slicing(user_transactions(data, 101), start, end))
+    query = query_transactions(data).where("user_id", "==", 101).where("quantity", ">", 1)
+    query.between(start, end)
+
+    assert np.array_equal(data[query.indices()], chained), "Query should match chained filters"
+    projected = query.rows(columns=["product_id", "quantity"])
+    assert projected.dtype.names == ("product_id", "quantity"), "Only projected columns are kept"
+    assert np.array_equal(projected["quantity"], chained["quantity"])
+
+    index = build_time_index(data)
+    indexed = query_transactions(data, index).where("product_id", "in", [40, 41])
+    indexed.between(start, end)
+    in_window = (data["timestamp"] >= start) & (data["timestamp"] <= end)
+    expected = np.flatnonzero(np.isin(data["product_id"], [40, 41]) & in_window)
+    assert np.array_equal(np.sort(indexed.indices()), expected), "Indexed query should agree"
+    window = query_transactions(data, index).between(start, end).rows(view=True)
+    assert np.shares_memory(window, index.data), "Time-range-only queries should return views"
+    with pytest.raises(ValueError, match="not contiguous"):
+        indexed.rows(view=True)
+
+    legacy = query_transactions(generate_transactions_array(30)).where("quantity", ">", 0)
+    assert legacy.rows(columns=["product_id", "quantity"]).shape == (30, 2)
+    assert np.array_equal(
+        legacy.rows(columns=["product_id", "quantity"]), product_quantity_array(legacy.data)
+    )
+
+
+def test_sharded_analysis_matches_single_process():
+    data = generate_transactions_bulk(50_000, seed=8)
+    order, offsets = partition_by_key(data, "product_id", 3)
+    shard_products = [
+        set(data["product_id"][order[start:stop]].tolist())
+        for start, stop in itertools.pairwise(offsets)
+    ]
+    assert not shard_products[0] & shard_products[1], "Each key should land in one shard"
+
+    for by in ("user_id", "product_id"):
+        for workers in (1, 2):
+            result = sharded_analysis(data, by=by, workers=workers)
+            assert np.isclose(result["total_revenue"], calculate_total_revenue(data))
+            assert result["unique_users"] == count_unique_users(data)
+            assert np.array_equal(result["user_transaction_count"], user_transaction_count(data))
+            assert np.allclose(result["top_products"], top_products(data)), f"{by=} {workers=}"
@@ -1,4 +1,17 @@
-from numpy_tasks.task_3 import workflow
+import numpy as np
+import pytest
+
+from numpy_tasks.task_3 import (
+    ArrayPipeline,
+    BufferPool,
+    blocked_transpose,
+    combine_arrays,
+    create_random_array,
+    reshape_array,
+    split_array,
+    transpose_array,
+    workflow,
+)
 
 
 def test_workflow():
@@ -9,3 +22,61 @@ def test_workflow():
     assert reshaped_array.shape == (3, 12), "Reshaped array should have shape 3x12"
     assert all(arr.shape[0] == 1 for arr in split_arrays), "Each split array should have 1 row"
     assert combined_array.shape == (3, 12), "Combined array should have shape 3x12"
+
+
+def test_array_pipeline_simplifies_and_reports_copies():
+    initial_array = create_random_array()
+    pipeline = ArrayPipeline(initial_array).transpose().reshape((3, 12)).split(3).combine()
+
+    result = pipeline.compute()
+
+    assert [name for name, _ in pipeline.simplified_steps()] == ["transpose", "reshape"]
+    assert np.array_equal(result, workflow()[-1]), "Lazy result should match eager workflow"
+    assert pipeline.stats[0]["copied_bytes"] == 0, "Transpose should be a view"
+    assert pipeline.copied_bytes == initial_array.nbytes, "Only the reshape should copy"
+    assert np.array_equal(pipeline.compute(simplify=False), result)
+
+
+def test_array_pipeline_is_lazy_and_rejects_invalid_chains():
+    pipeline = ArrayPipeline(create_random_array()).split(2).transpose()
+
+    assert pipeline.stats == [], "Nothing should run before compute"
+    with pytest.raises(ValueError, match="transpose cannot follow split"):
+        pipeline.compute()
+
+
+def test_blocked_transpose_matches_numpy():
+    array = np.arange(517 * 301).reshape(517, 301)
+
+    for workers in (1, 3):
+        result = blocked_transpose(array, tile=64, workers=workers)
+        assert result.flags.c_contiguous, "Blocked transpose should materialize C order"
+        assert np.array_equal(result, array.T)
+
+    square = np.arange(300 * 300).reshape(300, 300)
+    assert np.array_equal(blocked_transpose(square.copy(), tile=64, in_place=True), square.T)
+    assert np.array_equal(transpose_array(array, materialize=True), array.T)
+    assert np.array_equal(
+        reshape_array(transpose_array(array), (301 * 11, 47), blocked=True),
+        np.reshape(array.T, (301 * 11, 47)),
+    )
+
+
+def test_split_and_combine_reuse_pooled_buffers():
+    pool = BufferPool()
+    array = create_random_array()
+
+    for _ in range(3):
+        with pool.borrow(array.shape, array.dtype) as combined:
+            parts = split_array(array, 3, views=True)
+            assert all(np.shares_memory(part, array) for part in parts)
+            result = combine_arrays(parts, out=combined)
+            assert result is combined and np.array_equal(result, array)
+
+    assert (pool.hits, pool.misses) == (2, 1), "Buffers should be reused across iterations"
+
+    buffers = [np.empty((2, 6), dtype=array.dtype) for _ in range(3)]
+    assert split_array(array, 3, out=buffers) is buffers
+    assert np.array_equal(np.concatenate(buffers), array)
+    with pytest.raises(ValueError, match="views"):
+        split_array(array, 3, out=buffers, views=True)
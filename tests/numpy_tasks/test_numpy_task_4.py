@@ -0,0 +1,322 @@
+import tracemalloc
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from numpy_tasks.task_4 import (
+    SAVE_FORMATS,
+    ChunkedArray,
+    IntegrityError,
+    QuantileSketch,
+    RunningAggregate,
+    approximate_quantile,
+    compute_aggregates,
+    compute_mean,
+    compute_median,
+    compute_median_along_axis,
+    compute_std,
+    compute_std_along_axis,
+    compute_sum,
+    compute_sum_along_axis,
+    create_random_array,
+    iter_array_chunks,
+    load_array,
+    load_arrays,
+    load_columns,
+    parallel_reduce_along_axis,
+    read_text_array,
+    save_array,
+    save_arrays,
+    save_chunked,
+    save_columns,
+    verify_array,
+    write_manifest,
+)
+
+
+def test_iter_array_chunks_matches_saved_array(tmp_path):
+    array = create_random_array()
+    filename = str(tmp_path / "array")
+    save_array(array, filename)
+
+    for file_format in ("txt", "csv", "npy", "npz"):
+        chunks = list(iter_array_chunks(filename, file_format, chunk_rows=3))
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1], f"Bad chunking for {file_format}"
+        assert np.array_equal(np.concatenate(chunks), array), f"Bad data for {file_format}"
+
+
+def test_memmapped_loads_share_file_and_avoid_copies(tmp_path):
+    array = np.arange(1_000_000, dtype=np.int64).reshape(1_000, 1_000)
+    filename = str(tmp_path / "array")
+    np.save(f"{filename}.npy", array)
+    np.savez(f"{filename}.npz", array)
+
+    for file_format in ("npy", "npz"):
+        mapped = load_array(filename, file_format, mmap_mode="r")
+        assert isinstance(mapped, np.memmap), f"{file_format} should be memory-mapped"
+        assert np.array_equal(mapped, array)
+
+        tracemalloc.start()
+        total, mean = compute_sum(mapped), compute_mean(mapped)
+        column_sums = compute_sum_along_axis(mapped, axis=0)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert total == array.sum() and mean == array.mean()
+        assert np.isclose(compute_std(mapped), array.std())
+        assert np.array_equal(column_sums, array.sum(axis=0))
+        assert peak < array.nbytes, "Sum/mean should not copy the mapped array"
+
+    copy_on_write = load_array(filename, "npy", mmap_mode="c")
+    copy_on_write[0, 0] = -1
+    assert load_array(filename, "npy")[0, 0] == 0, "Copy-on-write must not touch the file"
+
+
+def test_save_columns_maps_single_columns(tmp_path):
+    data = np.zeros(5, dtype=[("a", np.int64), ("b", np.float64)])
+    data["a"] = np.arange(5)
+    data["b"] = np.linspace(0, 1, 5)
+
+    save_columns(data, str(tmp_path / "columns"))
+    columns = load_columns(str(tmp_path / "columns"), ["b"])
+
+    assert list(columns) == ["b"]
+    assert isinstance(columns["b"], np.memmap)
+    assert np.array_equal(columns["b"], data["b"])
+
+
+def test_read_text_array_matches_loadtxt(tmp_path):
+    array = np.random.default_rng(0).integers(-1_000, 1_000, size=(2_000, 7))
+    filename = str(tmp_path / "array")
+    save_array(array, filename)
+
+    for file_format, delimiter in (("txt", None), ("csv", ",")):
+        expected = np.loadtxt(f"{filename}.{file_format}", delimiter=delimiter, dtype=int)
+        stats: dict[str, float] = {}
+        result = read_text_array(filename, file_format, block_size=1_000, workers=3, stats=stats)
+        assert result.dtype == expected.dtype and np.array_equal(result, expected)
+        assert stats["rows"] == len(array) and stats["rows_per_second"] > 0
+
+    columns = read_text_array(filename, "csv", dtype=[np.int64, np.float64, np.int16] + [int] * 4)
+    assert columns.dtype.names == tuple(f"f{i}" for i in range(7))
+    assert np.array_equal(columns["f1"], array[:, 1].astype(np.float64))
+
+    parallel = load_array(filename, "csv", text_workers=2, block_size=1_000, dtype=np.float64)
+    assert parallel.dtype == np.float64 and np.array_equal(parallel, array)
+    loaded = load_arrays([filename], ("txt",), text_workers=2, block_size=1_000, verify=True)
+    assert np.array_equal(loaded[filename]["txt"], array), "Options should reach every load"
+
+
+def test_compute_aggregates_matches_numpy_per_axis():
+    array = np.random.default_rng(1).normal(1e9, 1.0, size=(1_000, 37))
+
+    for axis in (None, 0, 1):
+        aggregates = compute_aggregates(array, axis=axis, chunk_rows=64)
+        assert aggregates.count == (array.size if axis is None else array.shape[axis])
+        assert np.allclose(aggregates.total, np.sum(array, axis=axis), rtol=1e-12)
+        assert np.allclose(aggregates.mean, np.mean(array, axis=axis), rtol=1e-12)
+        assert np.allclose(aggregates.std, np.std(array, axis=axis), rtol=1e-6)
+        assert np.array_equal(aggregates.minimum, np.min(array, axis=axis))
+        assert np.array_equal(aggregates.maximum, np.max(array, axis=axis))
+
+
+def test_running_aggregates_merge_across_chunks():
+    array = create_random_array()
+    left = RunningAggregate.from_array(array[:3])
+    right = RunningAggregate.from_array(array[3:])
+
+    merged = left.merge(right)
+
+    assert merged.count == array.size and merged.total == array.sum()
+    assert np.isclose(merged.variance, array.var())
+
+    empty = compute_aggregates(np.zeros((0, 5)))
+    assert empty.count == 0 and empty.total == 0 and empty.minimum == np.inf
+    assert left.update(array[:0]).merge(empty).merge(right).as_dict() == merged.as_dict()
+    by_column = compute_aggregates(np.zeros((0, 5)), axis=0)
+    assert by_column.count == 0 and by_column.maximum.shape == (5,)
+    assert (merged.minimum, merged.maximum) == (array.min(), array.max())
+
+
+def test_compute_median_in_place_matches_copying_median():
+    array = np.random.default_rng(2).integers(0, 1_000, size=(101, 11))
+    expected = np.median(array)
+
+    assert compute_median(array.copy(), overwrite_input=True) == expected
+    assert np.array_equal(
+        compute_median_along_axis(array.copy(), axis=1, overwrite_input=True),
+        np.median(array, axis=1),
+    )
+
+
+SKETCH_RANK_TOLERANCE = 0.02
+SKETCH_MAX_ITEMS = 2_000
+
+
+def test_quantile_sketch_rank_error_is_bounded():
+    rng = np.random.default_rng(3)
+    chunks = [rng.normal(size=50_000) for _ in range(8)]
+    values = np.sort(np.concatenate(chunks))
+    quantiles = np.array([0.01, 0.25, 0.5, 0.75, 0.99])
+
+    streamed = approximate_quantile(iter(chunks), quantiles, k=200, seed=0)
+    left = QuantileSketch(200, seed=1).update(np.concatenate(chunks[:4]))
+    merged = left.merge(QuantileSketch(200, seed=2).update(np.concatenate(chunks[4:])))
+
+    for estimate in (streamed, merged.quantile(quantiles)):
+        ranks = np.searchsorted(values, estimate) / values.size
+        assert np.all(np.abs(ranks - quantiles) < SKETCH_RANK_TOLERANCE), "Rank error too large"
+    assert sum(level.size for level in merged.levels) < SKETCH_MAX_ITEMS, "Sketch grew unbounded"
+    assert merged.quantile(0.0) == values[0] and merged.quantile(1.0) == values[-1]
+
+
+def test_parallel_axis_reductions_match_serial():
+    array = np.random.default_rng(4).normal(size=(301, 157))
+
+    for reducer, serial in (("sum", np.sum), ("mean", np.mean), ("median", np.median)):
+        for axis in (0, 1):
+            expected = serial(array, axis=axis)
+            for backend in ("thread", "process"):
+                result = parallel_reduce_along_axis(array, reducer, axis, 4, backend)
+                assert np.allclose(result, expected), f"{reducer}/{axis}/{backend} differs"
+
+    assert np.allclose(compute_std_along_axis(array, axis=0, workers=3), np.std(array, axis=0))
+
+    empty = np.zeros((0, 5))
+    assert compute_sum_along_axis(empty, axis=1, workers=4).shape == (0,), "Empty input is valid"
+    scratch = array.copy()
+    median = compute_median_along_axis(scratch, axis=0, overwrite_input=True, workers=4)
+    assert np.allclose(median, np.median(array, axis=0))
+    assert not np.array_equal(scratch, array), "overwrite_input should let blocks sort in place"
+
+
+def test_process_reductions_reuse_memmaps_and_shared_segments(tmp_path, monkeypatch):
+    array = np.random.default_rng(5).normal(size=(203, 61))
+    filename = str(tmp_path / "array")
+    save_array(array, filename, ("npy",))
+    shared = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    in_shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shared.buf)
+    in_shared[...] = array
+
+    original = shared_memory.SharedMemory
+
+    def attach_only(*args, **kwargs):
+        assert not kwargs.get("create"), "Backed input must not be staged into a new segment"
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(shared_memory, "SharedMemory", attach_only)
+    try:
+        mapped = load_array(filename, "npy", mmap_mode="r")
+        for source, view in ((None, mapped[5:, 3:]), (shared, in_shared[::2, 1:])):
+            expected = array[5:, 3:] if source is None else array[::2, 1:]
+            for axis in (0, 1):
+                result = parallel_reduce_along_axis(
+                    view, "median", axis, 3, "process", shared=source
+                )
+                assert np.allclose(result, np.median(expected, axis=axis)), f"{source}/{axis}"
+    finally:
+        del in_shared
+        shared.close()
+        shared.unlink()
+
+
+def test_chunked_format_round_trip_and_metadata_queries(tmp_path):
+    array = np.arange(10_000, dtype=np.int32).reshape(1_000, 10)
+    filename = str(tmp_path / "array")
+
+    for compression in ("zlib", "lzma", None):
+        save_chunked(array, filename, chunk_rows=128, compression=compression)
+        assert np.array_equal(load_array(filename, "npc"), array)
+
+    chunked = ChunkedArray(filename)
+    assert compute_sum(chunked) == array.sum() and compute_mean(chunked) == array.mean()
+    assert chunked.chunks_read == 0, "sum/mean should come from chunk metadata"
+
+    assert np.array_equal(chunked.read_rows(300, 400), array[300:400])
+    assert chunked.chunks_read == len(range(300 // 128, 400 // 128 + 1)), "Read extra chunks"
+    for rows in (
+        slice(5, 900, 7),
+        slice(10, 2, -1),
+        slice(None, None, -3),
+        slice(-5, None),
+        slice(4, 4),
+    ):
+        assert np.array_equal(load_array(filename, "npc", rows=rows), array[rows]), f"{rows}"
+
+    chunked.chunks_read = 0
+    values = chunked.filter_range(2_000, 2_500)
+    assert np.array_equal(values, np.arange(2_000, 2_501))
+    assert chunked.chunks_read == 1, "Chunks outside the range should be skipped"
+
+
+def test_concurrent_save_and_load_with_timings(tmp_path):
+    arrays = {str(tmp_path / f"array_{i}"): create_random_array() + i for i in range(3)}
+    timings: dict[str, float] = {}
+
+    save_arrays(arrays, workers=4, timings=timings)
+
+    assert len(timings) == len(arrays) * len(SAVE_FORMATS)
+    for filename, array in arrays.items():
+        load_timings: dict[str, float] = {}
+        loaded = load_arrays(filename, workers=4, timings=load_timings)
+        assert set(loaded) == set(load_timings) == set(SAVE_FORMATS)
+        assert all(np.array_equal(value, array) for value in loaded.values())
+
+    timings.clear()
+    loaded_many = load_arrays(list(arrays), workers=4, timings=timings)
+    assert set(timings) == {f"{name}.{fmt}" for name in arrays for fmt in SAVE_FORMATS}
+    for filename, array in arrays.items():
+        assert all(np.array_equal(value, array) for value in loaded_many[filename].values())
+
+
+def test_failed_save_leaves_no_partial_file(tmp_path):
+    filename = str(tmp_path / "broken")
+
+    with pytest.raises(TypeError):
+        save_array(np.array([["a", "b"]]), filename, formats=("txt",))
+
+    assert list(tmp_path.iterdir()) == [], "Neither the target nor a temp file should remain"
+
+
+def test_checksum_manifest_locates_corrupted_rows(tmp_path):
+    array = np.arange(50_000, dtype=np.int64).reshape(5_000, 10)
+    filename = str(tmp_path / "array")
+    save_array(array, filename, (*SAVE_FORMATS, "npc"))
+    write_manifest(array, filename, chunk_rows=1_000)
+
+    for file_format in (*SAVE_FORMATS, "npc"):
+        assert verify_array(filename, file_format) == array.shape[0], f"{file_format} is intact"
+    tracemalloc.start()
+    verify_array(filename, "npz")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < array.nbytes // 2, "Verification should stream instead of loading the array"
+
+    npy = tmp_path / "array.npy"
+    raw = bytearray(npy.read_bytes())
+    raw[len(raw) - array.nbytes + 2_500 * array.strides[0]] ^= 0xFF
+    npy.write_bytes(bytes(raw))
+    with pytest.raises(IntegrityError) as error:
+        verify_array(filename, "npy")
+    assert error.value.rows == (2_000, 3_000), "The corrupted chunk should be reported"
+    with pytest.raises(IntegrityError, match="rows 2000:3000"):
+        load_array(filename, "npy", mmap_mode="r", verify=True)
+
+    csv = tmp_path / "array.csv"
+    lines = csv.read_text().splitlines()
+    lines[4_321] = "x,y"
+    csv.write_text("\n".join(lines) + "\n")
+    with pytest.raises(IntegrityError, match="rows 4000:5000 unreadable"):
+        verify_array(filename, "csv")
+    assert np.array_equal(load_array(filename, "txt", verify=True), array)
+
+
+def test_checksums_accept_text_files_that_flatten_shapes(tmp_path):
+    for shape in ((10,), (1, 10), (10, 1)):
+        array = np.arange(10).reshape(shape)
+        filename = str(tmp_path / f"array_{len(shape)}_{shape[0]}")
+        save_array(array, filename)
+        for file_format in SAVE_FORMATS:
+            assert verify_array(filename, file_format) == shape[0], f"{shape} {file_format}"
+            loaded = load_array(filename, file_format, verify=True)
+            assert np.array_equal(loaded.reshape(shape), array), f"{shape} {file_format}"